@@ -3,19 +3,49 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
+from flask_migrate import Migrate
+from werkzeug.middleware.proxy_fix import ProxyFix
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
+migrate = Migrate()
 
 def create_app():
     app = Flask(__name__)
     app.config.from_object('app.config.Config')
+    if app.config['PROXY_FIX_HOPS']:
+        # trust X-Forwarded-For from this many proxies, so rate limits see client IPs
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['PROXY_FIX_HOPS'], x_proto=app.config['PROXY_FIX_HOPS'])
 
     db.init_app(app)
+    migrate.init_app(app, db)
     bcrypt.init_app(app)
     JWTManager(app)
     CORS(app)
 
+    from app.services.metrics import metrics
+    metrics.init_app(app)
+    from app.services.slot_cache import slot_cache
+    slot_cache.init_app(app)
+    from app.services.availability_bitmap import bitmap_cache
+    bitmap_cache.init_app(app)
+    from app.services.webhook_dispatcher import dispatcher
+    dispatcher.init_app(app)
+    from app.services.claude_cache import claude_cache
+    claude_cache.init_app(app)
+    from app.services.job_queue import job_queue
+    job_queue.init_app(app)
+    from app.services.ics_feed import feed_cache
+    feed_cache.init_app(app)
+    from app.services.rate_limit import rate_limiter
+    rate_limiter.init_app(app)
+    from app.services.micro_cache import micro_cache
+    micro_cache.init_app(app)
+    from app.services.slugs import slug_cache
+    slug_cache.init_app(app)
+    from app.services.password_hasher import password_hasher
+    password_hasher.init_app(app)
+
     from app.blueprints.auth import auth_bp
     from app.blueprints.workspaces import workspaces_bp
     from app.blueprints.availability import availability_bp
@@ -24,6 +54,7 @@ def create_app():
     from app.blueprints.ai import ai_bp
     from app.blueprints.n8n import n8n_bp
     from app.blueprints.waitlist import waitlist_bp
+    from app.blueprints.calendar import calendar_bp
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(workspaces_bp)
@@ -33,5 +64,9 @@ def create_app():
     app.register_blueprint(ai_bp)
     app.register_blueprint(n8n_bp)
     app.register_blueprint(waitlist_bp)
+    app.register_blueprint(calendar_bp)
+
+    from app.cli import register_cli
+    register_cli(app)
 
     return app
\ No newline at end of file
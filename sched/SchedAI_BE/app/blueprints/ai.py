@@ -1,24 +1,36 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.models import Appointment, Transcript, AIDebrief
+from app.models import Appointment, AIJob
 from app.services.claude_service import call_claude
-from app import db
-from datetime import datetime, timedelta
+from app.services.claude_cache import claude_cache
+from app.services.ai_tasks import clean_json, optimize_week as run_optimize, generate_debrief as run_debrief, latest_transcript, debrief_steps, save_debrief
+from app.services.job_queue import job_queue, JobLimitError
+from app.services.slot_scorer import score_slots as score_locally, slot_window, MIN_GAP
+from datetime import timedelta
 import json
-import re
 
 ai_bp = Blueprint('ai', __name__, url_prefix='/ai')
 
-def clean_json(text):
-    text = re.sub(r'```json\s*', '', text)
-    text = re.sub(r'```\s*', '', text)
-    return text.strip()
-
 @ai_bp.route('/score-slots', methods=['POST'])
 @jwt_required()
 def score_slots():
     data = request.get_json()
     slots = data['slots']
+    if not slots:
+        return jsonify([]), 200
+    window_start, window_end = slot_window(slots, timedelta(minutes=MIN_GAP))
+    appts = Appointment.query.with_entities(Appointment.start_time, Appointment.end_time).filter(
+        Appointment.host_user_id == int(get_jwt_identity()),
+        Appointment.status == 'confirmed',
+        Appointment.start_time < window_end,
+        Appointment.end_time > window_start
+    ).all()
+    scored = score_locally(slots, [(a.start_time, a.end_time) for a in appts])
+    if data.get('mode') != 'llm':
+        return jsonify(scored), 200
+
+    # opt-in refinement: let Claude score against the same criteria, keeping
+    # the local scores if its answer doesn't parse
     prompt = f"""You are an expert productivity and scheduling AI assistant.
 
 Your task is to score each time slot from 0 to 100 based on the following criteria:
@@ -39,104 +51,117 @@ Slots to score:
     try:
         scored = json.loads(clean_json(response))
     except:
-        scored = slots
+        pass
     return jsonify(scored), 200
 
 
+def wants_sync():
+    # AI calls run as background jobs (202 + GET /ai/jobs/<id>) unless the
+    # caller opts into holding this request worker with ?sync=true
+    return request.args.get('sync', '').lower() in ('1', 'true')
+
+def submit(kind, params):
+    try:
+        job = job_queue.submit(int(get_jwt_identity()), kind, params)
+    except JobLimitError as e:
+        return jsonify({'error': str(e)}), 429
+    return jsonify(serialize_job(job)), 202
+
 @ai_bp.route('/optimize', methods=['POST'])
 @jwt_required()
 def optimize_week():
-    user_id = int(get_jwt_identity())
-    week_str = request.args.get('week')
-    if week_str:
-        week_start = datetime.strptime(week_str, '%Y-%m-%d')
-    else:
-        today = datetime.utcnow()
-        week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=7)
-    appts = Appointment.query.filter(
-        Appointment.host_user_id == user_id,
-        Appointment.start_time >= week_start,
-        Appointment.start_time < week_end,
-        Appointment.status == 'confirmed'
-    ).all()
-    appt_list = [{'id': a.id, 'title': a.title, 'start': a.start_time.isoformat(), 'end': a.end_time.isoformat(), 'type': a.type} for a in appts]
-
-    prompt = f"""You are an expert calendar optimization AI.
-
-Your task is to reschedule the given appointments to maximize productivity using these rules:
-- Cluster all meetings together in the same part of the day (morning or afternoon) to protect deep work blocks
-- Never schedule meetings back to back — always leave at least 10 minutes between them
-- Protect focus blocks — never move or overlap them with meetings
-- Place high-focus solo work in the morning (before 12PM)
-- Place collaborative meetings in the afternoon (after 1PM) where possible
-- Keep meetings within the same working day (9AM-6PM), never move to a different day unless absolutely necessary
-- Calculate a before score and after score from 0-100 based on how well the schedule follows these rules
-
-Return ONLY valid JSON. No explanation, no markdown, no backticks.
-The JSON must have exactly these fields:
-{{
-  "before_score": integer 0-100,
-  "after_score": integer 0-100,
-  "optimized": [array of appointments with same id and title but updated start and end times in ISO format]
-}}
-
-Appointments to optimize:
-{json.dumps(appt_list)}"""
-
-    response = call_claude(prompt)
-    try:
-        result = json.loads(clean_json(response))
-    except:
-        result = {'before_score': 58, 'after_score': 84, 'optimized': appt_list}
-    return jsonify(result), 200
+    params = {'week': request.args.get('week')}
+    if not wants_sync():
+        return submit('optimize', params)
+    result, status = run_optimize(int(get_jwt_identity()), params)
+    return jsonify(result), status
 
 
 @ai_bp.route('/debrief', methods=['POST'])
 @jwt_required()
 def generate_debrief():
+    data = request.get_json()
+    params = {'appointment_id': data['appointment_id']}
+    if not wants_sync():
+        return submit('debrief', params)
+    result, status = run_debrief(int(get_jwt_identity()), params)
+    return jsonify(result), status
+
+
+@ai_bp.route('/debrief/stream', methods=['POST'])
+@jwt_required()
+def stream_debrief():
     data = request.get_json()
     appointment_id = data['appointment_id']
-    transcript = Transcript.query.filter_by(appointment_id=appointment_id).order_by(Transcript.created_at.desc()).first()
+    transcript = latest_transcript(appointment_id)
     if not transcript:
         return jsonify({'error': 'No transcript found'}), 404
 
-    prompt = f"""You are an expert executive assistant AI with years of experience in meeting management.
-
-Analyze the following meeting transcript carefully and extract the most important information.
-
-Your analysis must include:
-1. A clear and concise summary (2-3 sentences) covering the main purpose of the meeting, key points discussed, and final outcome
-2. A list of specific, actionable action items — each one must mention WHO is responsible and WHAT they need to do
-3. A suggested follow-up date based on context clues in the transcript (deadlines mentioned, urgency, or default to 7 days from now if unclear)
-
-Return ONLY valid JSON. No explanation, no markdown, no backticks.
-The JSON must have exactly these fields:
-{{
-  "summary": "2-3 sentence summary of the meeting",
-  "action_items": ["Person: specific action", "Person: specific action"],
-  "suggested_followup_date": "YYYY-MM-DD"
-}}
-
-Meeting transcript:
-{transcript.content}"""
-
-    response = call_claude(prompt)
+    # Server-Sent Events: `progress` events count the summarized parts of a
+    # long transcript, `delta` events carry raw model output as it arrives,
+    # `done` carries the parsed debrief once it has been saved. The prompt is
+    # built in here, so a long transcript's first progress event goes out
+    # before any Claude call.
+    def events():
+        parts = []
+        try:
+            for kind, value in debrief_steps(transcript):
+                if kind == 'progress':
+                    yield sse('progress', value)
+                else:
+                    prompt = value
+            for text in call_claude(prompt, stream=True):
+                parts.append(text)
+                yield sse('delta', {'text': text})
+            yield sse('done', save_debrief(appointment_id, ''.join(parts)))
+        except Exception as e:
+            yield sse('error', {'error': str(e)})
+
+    return Response(stream_with_context(events()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def parse_wait(value):
     try:
-        result = json.loads(clean_json(response))
-    except:
-        result = {'summary': response, 'action_items': [], 'suggested_followup_date': None}
-
-    debrief = AIDebrief(
-        appointment_id=appointment_id,
-        summary=result.get('summary'),
-        action_items=json.dumps(result.get('action_items', [])),
-        suggested_followup_date=datetime.strptime(result['suggested_followup_date'], '%Y-%m-%d') if result.get('suggested_followup_date') else None
-    )
-    db.session.add(debrief)
-    db.session.commit()
-    return jsonify({
-        'summary': result.get('summary'),
-        'actionItems': result.get('action_items', []),
-        'suggestedFollowupDate': result.get('suggested_followup_date')
-    }), 200
\ No newline at end of file
+        wait = float(value)
+    except ValueError:
+        return None
+    # NaN fails the comparison
+    return min(wait, 30) if wait >= 0 else None
+
+@ai_bp.route('/jobs/<job_id>', methods=['GET'])
+@jwt_required()
+def get_job(job_id):
+    job = AIJob.query.get_or_404(job_id)
+    if job.user_id != int(get_jwt_identity()):
+        return jsonify({'error': 'Not found'}), 404
+    if job_queue.is_stale(job):
+        # committing expires job, so it reloads as failed below
+        job_queue.expire_stale(job.user_id)
+    # ?wait=N long-polls for up to N (at most 30) seconds until the job finishes
+    wait = parse_wait(request.args.get('wait', '0'))
+    if wait is None:
+        return jsonify({'error': 'wait must be a non-negative number of seconds'}), 400
+    if wait > 0 and job.status in ('queued', 'running'):
+        job = job_queue.wait(job_id, wait)
+    return jsonify(serialize_job(job)), 200
+
+
+@ai_bp.route('/cache-stats', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    return jsonify(claude_cache.stats()), 200
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'result': json.loads(job.result) if job.result else None,
+        'error': job.error,
+        'created_at': job.created_at.isoformat() if job.created_at else None,
+        'finished_at': job.finished_at.isoformat() if job.finished_at else None
+    }
@@ -1,36 +1,106 @@
-from flask import Blueprint, request, jsonify, Response
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Appointment, Transcript
 from app.services.conflict_checker import check_conflicts
 from app.services.waitlist_checker import check_waitlist
+from app.services.slot_cache import slot_cache
+from app.services import transcript_store, calendar_version
+from app.services.ics_feed import calendar
+from app.services.rate_limit import rate_limited
+from app.services.micro_cache import micro_cache, micro_cached
+from app.services.serializers import Projection, json_response, key_case, KEY_CASE_HEADER, encode_cursor, decode_cursor
+from sqlalchemy import and_, or_
 from datetime import datetime, timedelta
+import hashlib
 
 appointments_bp = Blueprint('appointments', __name__, url_prefix='/appointments')
 
+PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
 @appointments_bp.route('', methods=['GET'])
 @jwt_required()
 def get_appointments():
     user_id = int(get_jwt_identity())
+    ranged = 'from' in request.args or 'to' in request.args
+    week_start = None if ranged else resolve_week()
+    # the body only depends on the host's calendar version, the query string
+    # and the week it resolves to, so an unchanged calendar is answered
+    # without touching appointments
+    etag = listing_etag(user_id, week_start)
+    if request.if_none_match.contains(etag):
+        return not_modified(etag)
+
+    fields = request.args.get('fields')
+    projection = APPOINTMENT.select([f for f in fields.split(',') if f] if fields else None)
+    if ranged:
+        body = list_range(user_id, projection)
+    else:
+        week_end = week_start + timedelta(days=7)
+        rows = Appointment.query.with_entities(*projection.columns).filter(
+            Appointment.host_user_id == user_id,
+            Appointment.start_time >= week_start,
+            Appointment.start_time < week_end
+        ).all()
+        body = projection.dump_rows(rows)
+    resp = json_response(body)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp, 200
+
+def resolve_week():
+    # ?week=YYYY-MM-DD, else midnight on this week's Monday
     week_str = request.args.get('week')
     if week_str:
-        week_start = datetime.strptime(week_str, '%Y-%m-%d')
-    else:
-        today = datetime.utcnow()
-        week_start = today - timedelta(days=today.weekday())
-    week_end = week_start + timedelta(days=7)
-    appts = Appointment.query.filter(
-        Appointment.host_user_id == user_id,
-        Appointment.start_time >= week_start,
-        Appointment.start_time < week_end
-    ).all()
-    return jsonify([serialize(a) for a in appts]), 200
+        return datetime.strptime(week_str, '%Y-%m-%d')
+    today = datetime.combine(datetime.utcnow().date(), datetime.min.time())
+    return today - timedelta(days=today.weekday())
+
+def list_range(user_id, projection):
+    # ?from=&to= (ISO dates or datetimes, to exclusive), keyset-paginated on
+    # (start_time, id) with ?cursor= from the previous page's next_cursor
+    limit = min(request.args.get('limit', PAGE_SIZE, type=int), MAX_PAGE_SIZE)
+    # start_time and id ride along after the projected columns for the cursor
+    query = Appointment.query.with_entities(
+        *projection.columns, Appointment.start_time, Appointment.id
+    ).filter(Appointment.host_user_id == user_id)
+    if 'from' in request.args:
+        query = query.filter(Appointment.start_time >= datetime.fromisoformat(request.args['from']))
+    if 'to' in request.args:
+        query = query.filter(Appointment.start_time < datetime.fromisoformat(request.args['to']))
+    cursor = request.args.get('cursor')
+    if cursor:
+        after_start, after_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Appointment.start_time > after_start,
+            and_(Appointment.start_time == after_start, Appointment.id > after_id)
+        ))
+    rows = query.order_by(Appointment.start_time, Appointment.id).limit(limit + 1).all()
+    page = rows[:limit]
+    return {
+        'appointments': projection.dump_rows(page),
+        'next_cursor': encode_cursor(*page[-1][-2:]) if len(rows) > limit else None
+    }
+
+def listing_etag(user_id, week_start=None):
+    version = calendar_version.current(user_id)
+    query = '&'.join(f'{k}={v}' for k, v in sorted(request.args.items(multi=True)))
+    week = week_start.date().isoformat() if week_start else ''
+    return hashlib.sha1(f'{user_id}:{version}:{key_case()}:{week}:{query}'.encode()).hexdigest()
+
+def not_modified(etag):
+    resp = Response(status=304)
+    resp.vary.add(KEY_CASE_HEADER)
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'private, no-cache'
+    return resp
 
 @appointments_bp.route('/<int:appt_id>', methods=['GET'])
 @jwt_required()
 def get_appointment(appt_id):
     appt = Appointment.query.get_or_404(appt_id)
-    return jsonify(serialize(appt)), 200
+    return json_response(serialize(appt))
 
 @appointments_bp.route('', methods=['POST'])
 @jwt_required()
@@ -39,8 +109,10 @@ def create_appointment():
     data = request.get_json()
     start = datetime.fromisoformat(data['start_time'])
     end = datetime.fromisoformat(data['end_time'])
+    calendar_version.bump(user_id)
     conflict = check_conflicts(user_id, start, end)
     if conflict['conflict']:
+        db.session.rollback()
         return jsonify(conflict), 409
     appt = Appointment(
         host_user_id=user_id,
@@ -55,7 +127,8 @@ def create_appointment():
     )
     db.session.add(appt)
     db.session.commit()
-    return jsonify(serialize(appt)), 201
+    slot_cache.invalidate_interval(user_id, start, end)
+    return json_response(serialize(appt), 201)
 
 @appointments_bp.route('/<int:appt_id>', methods=['PATCH'])
 @jwt_required()
@@ -64,21 +137,34 @@ def update_appointment(appt_id):
     appt = Appointment.query.get_or_404(appt_id)
     data = request.get_json()
     if 'start_time' in data and 'end_time' in data:
+        old_start, old_end = appt.start_time, appt.end_time
         start = datetime.fromisoformat(data['start_time'])
         end = datetime.fromisoformat(data['end_time'])
-        conflict = check_conflicts(user_id, start, end, exclude_id=appt_id)
+        calendar_version.bump(appt.host_user_id)
+        conflict = check_conflicts(appt.host_user_id, start, end, exclude_id=appt_id)
         if conflict['conflict']:
+            db.session.rollback()
             return jsonify(conflict), 409
         appt.start_time = start
         appt.end_time = end
+        appt.sequence = (appt.sequence or 0) + 1
         db.session.commit()
-        check_waitlist(user_id)
+        slot_cache.invalidate_interval(appt.host_user_id, old_start, old_end)
+        slot_cache.invalidate_interval(appt.host_user_id, start, end)
+        check_waitlist(user_id, old_start, old_end)
     if 'title' in data:
         appt.title = data['title']
     if 'status' in data:
         appt.status = data['status']
+    if 'title' in data or 'status' in data:
+        appt.sequence = (appt.sequence or 0) + 1
+        calendar_version.bump(appt.host_user_id)
     db.session.commit()
-    return jsonify(serialize(appt)), 200
+    if 'status' in data:
+        slot_cache.invalidate_interval(appt.host_user_id, appt.start_time, appt.end_time)
+    elif 'title' in data:
+        slot_cache.touch(appt.host_user_id)
+    return json_response(serialize(appt))
 
 @appointments_bp.route('/<int:appt_id>', methods=['DELETE'])
 @jwt_required()
@@ -86,57 +172,108 @@ def delete_appointment(appt_id):
     user_id = int(get_jwt_identity())
     appt = Appointment.query.get_or_404(appt_id)
     appt.status = 'cancelled'
+    appt.sequence = (appt.sequence or 0) + 1
+    calendar_version.bump(appt.host_user_id)
     db.session.commit()
-    booked = check_waitlist(user_id)
+    slot_cache.invalidate_interval(appt.host_user_id, appt.start_time, appt.end_time)
+    booked = check_waitlist(user_id, appt.start_time, appt.end_time)
     return jsonify({'message': 'Cancelled', 'waitlist_booked': booked}), 200
 
 @appointments_bp.route('/<int:appt_id>/transcript', methods=['GET'])
 @jwt_required()
 def get_transcript(appt_id):
-    transcript = Transcript.query.filter_by(appointment_id=appt_id).order_by(Transcript.created_at.desc()).first()
-    if not transcript:
-        return jsonify({'error': 'No transcript found'}), 404
-    return jsonify({'id': transcript.id, 'content': transcript.content, 'created_at': transcript.created_at.isoformat()}), 200
+    legacy = None
+    total = transcript_store.total_length(appt_id)
+    if not total:
+        # transcripts saved before segmented storage
+        legacy = Transcript.query.filter_by(appointment_id=appt_id).order_by(Transcript.created_at.desc()).first()
+        if not legacy:
+            return jsonify({'error': 'No transcript found'}), 404
+        total = len(legacy.content)
+
+    # ?from_seq=&to_seq= pages through segments; ?offset=&length= reads a
+    # character range; neither returns the whole transcript
+    if 'from_seq' in request.args or 'to_seq' in request.args:
+        to_seq = request.args.get('to_seq', type=int)
+        segments = transcript_store.read_segments(appt_id, request.args.get('from_seq', 0, type=int), to_seq)
+        return jsonify({'segments': segments, 'total_length': total}), 200
+    if 'offset' in request.args or 'length' in request.args:
+        offset = request.args.get('offset', 0, type=int)
+        length = request.args.get('length', type=int)
+        if legacy:
+            content = legacy.content[offset:offset + length if length is not None else None]
+        else:
+            content = transcript_store.read(appt_id, offset, length)
+        end = offset + len(content)
+        return jsonify({
+            'content': content,
+            'offset': offset,
+            'length': len(content),
+            'total_length': total,
+            'next_offset': end if end < total else None
+        }), 200
+
+    transcript = legacy or transcript_store.latest(appt_id)
+    return jsonify({'id': transcript.id, 'content': transcript.content, 'created_at': transcript.created_at.isoformat(),
+                    'total_length': total}), 200
+
+@appointments_bp.route('/<int:appt_id>/transcript/stream', methods=['GET'])
+@jwt_required()
+def stream_transcript(appt_id):
+    if not transcript_store.total_length(appt_id):
+        transcript = transcript_store.latest(appt_id)
+        if not transcript:
+            return jsonify({'error': 'No transcript found'}), 404
+        return Response(transcript.content, mimetype='text/plain')
+    return Response(stream_with_context(transcript_store.iter_text(appt_id)), mimetype='text/plain')
 
 @appointments_bp.route('/<int:appt_id>/transcript', methods=['POST'])
 @jwt_required()
 def save_transcript(appt_id):
+    # full-text save; only the part not already stored is written
     data = request.get_json()
-    transcript = Transcript(appointment_id=appt_id, content=data['content'])
-    db.session.add(transcript)
-    db.session.commit()
-    return jsonify({'message': 'Transcript saved', 'id': transcript.id}), 201
+    segments = transcript_store.save(appt_id, data['content'])
+    return jsonify({'message': 'Transcript saved', 'id': segments[-1].id if segments else None,
+                    'total_length': len(data['content'])}), 201
+
+@appointments_bp.route('/<int:appt_id>/transcript/append', methods=['POST'])
+@jwt_required()
+def append_transcript(appt_id):
+    data = request.get_json()
+    segments = transcript_store.append(appt_id, data['text'])
+    if not segments:
+        return jsonify({'total_length': transcript_store.total_length(appt_id)}), 200
+    return jsonify({
+        'seq': segments[-1].seq,
+        'offset': segments[0].offset,
+        'length': len(data['text']),
+        'total_length': segments[-1].offset + segments[-1].length
+    }), 201
 
 @appointments_bp.route('/<int:appt_id>/ics', methods=['GET'])
+@rate_limited('appt_id')
+@micro_cached
 def get_ics(appt_id):
     appt = Appointment.query.get_or_404(appt_id)
-    ics = f"""BEGIN:VCALENDAR
-VERSION:2.0
-BEGIN:VEVENT
-SUMMARY:{appt.title}
-DTSTART:{appt.start_time.strftime('%Y%m%dT%H%M%SZ')}
-DTEND:{appt.end_time.strftime('%Y%m%dT%H%M%SZ')}
-DESCRIPTION:{appt.reason or ''}
-END:VEVENT
-END:VCALENDAR"""
+    micro_cache.depends_on(appt.host_user_id)
+    ics = ''.join(calendar([(appt.id, appt.title, appt.reason, appt.start_time, appt.end_time,
+                             appt.sequence, appt.updated_at)]))
     return Response(ics, mimetype='text/calendar',
                     headers={'Content-Disposition': f'attachment; filename=appointment_{appt_id}.ics'})
 
+APPOINTMENT = Projection([
+    ('id', Appointment.id),
+    ('workspace_id', Appointment.workspace_id),
+    ('host_user_id', Appointment.host_user_id),
+    ('guest_name', Appointment.guest_name),
+    ('guest_email', Appointment.guest_email),
+    ('title', Appointment.title),
+    ('reason', Appointment.reason),
+    ('start_time', Appointment.start_time),
+    ('end_time', Appointment.end_time),
+    ('type', Appointment.type),
+    ('status', Appointment.status)
+], compat_aliases=('guest_name', 'guest_email', 'start_time', 'end_time'))
+
 def serialize(a):
-    return {
-        'id': a.id,
-        'workspace_id': a.workspace_id,
-        'host_user_id': a.host_user_id,
-        'guest_name': a.guest_name,
-        'guest_email': a.guest_email,
-        'guestName': a.guest_name,
-        'guestEmail': a.guest_email,
-        'title': a.title,
-        'reason': a.reason,
-        'start_time': a.start_time.isoformat(),
-        'end_time': a.end_time.isoformat(),
-        'startTime': a.start_time.isoformat(),
-        'endTime': a.end_time.isoformat(),
-        'type': a.type,
-        'status': a.status
-    }
\ No newline at end of file
+    return APPOINTMENT.dump(a)
@@ -1,38 +1,78 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
-from app import db, bcrypt
+from app import db
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from app.models import User
-import re
+from app.services.reminder_export import valid_timezone
+from app.services.slugs import slug_base, prefix_match, next_free
+from app.services.password_hasher import password_hasher, HashLimitError
+
+SLUG_ATTEMPTS = 5
 
 auth_bp = Blueprint('auth', __name__, url_prefix='/auth')
 
 def generate_slug(name):
-    slug = re.sub(r'\s+', '', name).lower()
-    base = slug
-    i = 1
-    while User.query.filter_by(slug=slug).first():
-        slug = f"{base}{i}"
-        i += 1
-    return slug
+    # every slug taken from this base in one indexed prefix query; a racing
+    # registration can still take the result, which register() retries
+    base = slug_base(name)
+    taken = set(db.session.execute(select(User.slug).where(prefix_match(base))).scalars())
+    return next_free(base, taken)
+
+def busy(error):
+    resp = jsonify({'error': str(error)})
+    resp.headers['Retry-After'] = '1'
+    return resp, 503
 
 @auth_bp.route('/register', methods=['POST'])
 def register():
     data = request.get_json()
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Email already registered'}), 409
-    hashed = bcrypt.generate_password_hash(data['password']).decode('utf-8')
-    slug = generate_slug(data['name'])
-    user = User(name=data['name'], email=data['email'], password_hash=hashed, slug=slug)
-    db.session.add(user)
-    db.session.commit()
+    tz = data.get('timezone') or 'UTC'
+    if not valid_timezone(tz):
+        return jsonify({'error': 'Unknown timezone'}), 400
+    # hand the connection back to the pool while bcrypt runs
+    db.session.rollback()
+    try:
+        hashed = password_hasher.hash(data['password'])
+    except HashLimitError as e:
+        return busy(e)
+    for _ in range(SLUG_ATTEMPTS):
+        user = User(name=data['name'], email=data['email'], password_hash=hashed,
+                    slug=generate_slug(data['name']), timezone=tz)
+        db.session.add(user)
+        try:
+            db.session.commit()
+            break
+        except IntegrityError:
+            db.session.rollback()
+            if User.query.filter_by(email=data['email']).first():
+                return jsonify({'error': 'Email already registered'}), 409
+    else:
+        return jsonify({'error': 'Could not allocate a profile link, try again'}), 503
     token = create_access_token(identity=str(user.id))
     return jsonify({'token': token, 'user': {'id': user.id, 'name': user.name, 'slug': user.slug}}), 201
 
 @auth_bp.route('/login', methods=['POST'])
 def login():
     data = request.get_json()
-    user = User.query.filter_by(email=data['email']).first()
-    if not user or not bcrypt.check_password_hash(user.password_hash, data['password']):
-        return jsonify({'error': 'Invalid credentials'}), 401
+    user = db.session.execute(
+        select(User.id, User.name, User.slug, User.password_hash).where(User.email == data['email'])
+    ).first()
+    # hand the connection back to the pool while bcrypt runs
+    db.session.rollback()
+    try:
+        if not user or not password_hasher.verify(user.password_hash, data['password']):
+            return jsonify({'error': 'Invalid credentials'}), 401
+        new_hash = password_hasher.upgrade(user.password_hash, data['password'])
+    except HashLimitError as e:
+        return busy(e)
+    if new_hash:
+        # BCRYPT_LOG_ROUNDS changed since this hash was made
+        User.query.filter_by(id=user.id, password_hash=user.password_hash).update(
+            {User.password_hash: new_hash}, synchronize_session=False
+        )
+        db.session.commit()
     token = create_access_token(identity=str(user.id))
     return jsonify({'token': token, 'user': {'id': user.id, 'name': user.name, 'slug': user.slug}}), 200
\ No newline at end of file
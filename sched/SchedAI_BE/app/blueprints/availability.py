@@ -2,7 +2,11 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import AvailabilityRule, User
-from app.services.slot_generator import generate_slots
+from app.services.slot_cache import slot_cache
+from app.services.availability_bitmap import WeeklyAvailability, store
+from app.services.reminder_export import valid_timezone
+from app.services.rate_limit import rate_limited
+from app.services.micro_cache import micro_cache, micro_cached
 from datetime import datetime
 
 availability_bp = Blueprint('availability', __name__, url_prefix='/availability')
@@ -12,8 +16,13 @@ availability_bp = Blueprint('availability', __name__, url_prefix='/availability'
 def save_availability():
     user_id = int(get_jwt_identity())
     data = request.get_json()
+    if 'timezone' in data:
+        if not valid_timezone(data['timezone']):
+            return jsonify({'error': 'Unknown timezone'}), 400
+        User.query.filter_by(id=user_id).update({User.timezone: data['timezone']})
     # delete existing rules and replace
     AvailabilityRule.query.filter_by(user_id=user_id).delete()
+    bookable = []
     for rule in data['rules']:
         r = AvailabilityRule(
             user_id=user_id,
@@ -24,7 +33,11 @@ def save_availability():
             is_bookable=rule.get('is_bookable', True)
         )
         db.session.add(r)
+        if r.is_bookable:
+            bookable.append(r)
+    store(user_id, WeeklyAvailability.compile(bookable))
     db.session.commit()
+    slot_cache.invalidate_host(user_id)
     return jsonify({'message': 'Availability saved'}), 200
 
 @availability_bp.route('/<int:user_id>', methods=['GET'])
@@ -40,8 +53,11 @@ def get_availability(user_id):
     } for r in rules]), 200
 
 @availability_bp.route('/<int:user_id>/slots', methods=['GET'])
+@rate_limited('user_id')
+@micro_cached
 def get_slots(user_id):
+    micro_cache.depends_on(user_id)
     date_str = request.args.get('date')
     target_date = datetime.strptime(date_str, '%Y-%m-%d').date() if date_str else datetime.utcnow().date()
-    slots = generate_slots(user_id, target_date)
+    slots = slot_cache.get_slots(user_id, target_date)
     return jsonify(slots), 200
\ No newline at end of file
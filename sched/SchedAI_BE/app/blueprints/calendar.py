@@ -0,0 +1,73 @@
+import hmac
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app import db
+from app.models import User, Appointment
+from app.services.ics_feed import calendar, feed_cache, feed_token, busy_only
+from app.services.rate_limit import rate_limited
+from datetime import date, datetime, timedelta
+
+calendar_bp = Blueprint('calendar', __name__, url_prefix='/calendar')
+
+@calendar_bp.route('/<slug>.ics', methods=['GET'])
+@rate_limited('slug')
+def get_feed(slug):
+    # subscribable feed of the host's confirmed appointments over a rolling
+    # window; Google/Outlook poll it, so repeat polls are answered from the
+    # calendar version alone. Anyone can guess a slug, so titles and reasons
+    # (guest names among them) are only included with the host's token.
+    user = User.query.filter_by(slug=slug).first_or_404()
+    token = request.args.get('token')
+    detailed = token is not None
+    if detailed and not hmac.compare_digest(token, feed_token(current_app.config['SECRET_KEY'], user.id)):
+        return jsonify({'error': 'Not found'}), 404
+    today = date.today()
+    window_start = today - timedelta(days=current_app.config['ICS_FEED_PAST_DAYS'])
+    window_end = today + timedelta(days=current_app.config['ICS_FEED_FUTURE_DAYS'])
+    key = (user.id, user.calendar_version, window_start, detailed)
+    etag = f"{user.id}-{user.calendar_version}-{window_start.isoformat()}-{'full' if detailed else 'busy'}"
+    # the window rolls over at midnight even when nothing was edited
+    last_modified = max(user.calendar_updated_at or datetime.min, datetime.combine(today, datetime.min.time()))
+
+    headers = {
+        'Content-Disposition': f'inline; filename={slug}.ics',
+        'Cache-Control': f"{'private' if detailed else 'public'}, max-age=300"
+    }
+    if request.if_none_match:
+        not_modified = request.if_none_match.contains(etag)
+    else:
+        since = request.if_modified_since
+        not_modified = since is not None and last_modified.replace(microsecond=0) <= since.replace(tzinfo=None)
+
+    if not_modified:
+        resp = Response(status=304, headers=headers)
+    else:
+        body = feed_cache.get(key)
+        if body is None:
+            rows = Appointment.query.with_entities(
+                Appointment.id, Appointment.title, Appointment.reason, Appointment.start_time,
+                Appointment.end_time, Appointment.sequence, Appointment.updated_at
+            ).filter(
+                Appointment.host_user_id == user.id,
+                Appointment.status == 'confirmed',
+                Appointment.start_time >= datetime.combine(window_start, datetime.min.time()),
+                Appointment.start_time < datetime.combine(window_end, datetime.min.time())
+            ).order_by(Appointment.start_time).yield_per(500)
+            events = rows if detailed else busy_only(rows)
+            body = stream_with_context(feed_cache.stream(key, calendar(events, name=user.name)))
+        resp = Response(body, mimetype='text/calendar', headers=headers)
+    resp.set_etag(etag)
+    resp.last_modified = last_modified
+    return resp
+
+
+@calendar_bp.route('/feed', methods=['GET'])
+@jwt_required()
+def get_feed_urls():
+    # the host's own subscription link, with titles and reasons
+    user = db.session.get(User, int(get_jwt_identity()))
+    token = feed_token(current_app.config['SECRET_KEY'], user.id)
+    return jsonify({
+        'public_url': f'/calendar/{user.slug}.ics',
+        'private_url': f'/calendar/{user.slug}.ics?token={token}'
+    }), 200
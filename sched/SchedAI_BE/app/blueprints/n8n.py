@@ -1,25 +1,44 @@
-from flask import Blueprint, jsonify
+from flask import Blueprint, Response, request, stream_with_context
 from app.models import Appointment
-from datetime import datetime, timedelta, date
+from app.services.serializers import Projection, json_response, dumps, encode_cursor, decode_cursor
+from app.services.reminder_export import upcoming
 
 n8n_bp = Blueprint('n8n', __name__, url_prefix='/n8n')
 
+REMINDER = Projection([
+    ('appointment_id', Appointment.id),
+    ('title', Appointment.title),
+    ('guest_name', Appointment.guest_name),
+    ('guest_email', Appointment.guest_email),
+    ('start_time', Appointment.start_time),
+    ('end_time', Appointment.end_time)
+])
+MAX_EXPORT_DAYS = 14
+
 @n8n_bp.route('/tomorrow-appointments', methods=['GET'])
 def tomorrow_appointments():
-    tomorrow = date.today() + timedelta(days=1)
-    start = datetime.combine(tomorrow, datetime.min.time())
-    end = start + timedelta(days=1)
-    appts = Appointment.query.filter(
-        Appointment.start_time >= start,
-        Appointment.start_time < end,
-        Appointment.status == 'confirmed',
-        Appointment.guest_email != None
-    ).all()
-    return jsonify([{
-        'appointment_id': a.id,
-        'title': a.title,
-        'guest_name': a.guest_name,
-        'guest_email': a.guest_email,
-        'start_time': a.start_time.isoformat(),
-        'end_time': a.end_time.isoformat()
-    } for a in appts]), 200
\ No newline at end of file
+    # "tomorrow" is each host's own tomorrow, as in /upcoming-appointments
+    rows = [row for row, _ in upcoming(REMINDER.columns)]
+    return json_response(REMINDER.dump_rows(rows))
+
+@n8n_bp.route('/upcoming-appointments', methods=['GET'])
+def upcoming_appointments():
+    # NDJSON, one reminder per line. ?start_day= (default 1, tomorrow) and
+    # ?days= (default 1) select host-local days; each line carries a `cursor`
+    # that resumes the export after it, and ?limit= caps the lines returned
+    start_day = request.args.get('start_day', 1, type=int)
+    days = request.args.get('days', 1, type=int)
+    if not 1 <= days <= MAX_EXPORT_DAYS or start_day < 0:
+        return json_response({'error': f'start_day must be >= 0 and days between 1 and {MAX_EXPORT_DAYS}'}, 400)
+    cursor = request.args.get('cursor')
+    after = decode_cursor(cursor) if cursor else None
+    limit = request.args.get('limit', type=int)
+
+    def lines():
+        for row, tz_name in upcoming(REMINDER.columns, start_day, days, after, limit):
+            item = REMINDER.dump_rows([row], 'snake')[0]
+            item['host_timezone'] = tz_name
+            item['cursor'] = encode_cursor(*row[-2:])
+            yield dumps(item) + b'\n'
+
+    return Response(stream_with_context(lines()), mimetype='application/x-ndjson')
@@ -1,30 +1,42 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, abort, request, jsonify
 from app import db
-from app.models import User, Appointment, Waitlist
-from app.services.slot_generator import generate_slots
+from app.models import Appointment, Waitlist
+from app.services.slot_cache import slot_cache
+from app.services import calendar_version
+from app.services.slugs import slug_cache
+from app.services.rate_limit import rate_limited
+from app.services.micro_cache import micro_cache, micro_cached
 from datetime import datetime, timedelta, date
 
 public_bp = Blueprint('public', __name__, url_prefix='/public')
 
+def host_or_404(slug):
+    host = slug_cache.resolve(slug)
+    if host is None:
+        abort(404)
+    return host
+
 @public_bp.route('/slots/<slug>', methods=['GET'])
+@rate_limited('slug')
+@micro_cached
 def get_public_slots(slug):
-    user = User.query.filter_by(slug=slug).first_or_404()
-    slots = []
+    user = host_or_404(slug)
+    micro_cache.depends_on(user.id)
     today = date.today()
-    for i in range(7):
-        target = today + timedelta(days=i)
-        day_slots = generate_slots(user.id, target)
-        slots.extend(day_slots)
+    by_day = slot_cache.get_slots_range(user.id, today, today + timedelta(days=6))
+    slots = [s for day_slots in by_day.values() for s in day_slots]
     return jsonify({'user': {'name': user.name, 'slug': user.slug}, 'slots': slots}), 200
 
 @public_bp.route('/book/<slug>', methods=['POST'])
+@rate_limited('slug')
 def book_slot(slug):
-    user = User.query.filter_by(slug=slug).first_or_404()
+    user = host_or_404(slug)
     data = request.get_json()
     start = datetime.fromisoformat(data['start_time'])
     end = datetime.fromisoformat(data['end_time'])
 
-    # check if slot is still free
+    # lock the host's calendar, then check if slot is still free
+    calendar_version.bump(user.id)
     conflict = Appointment.query.filter(
         Appointment.host_user_id == user.id,
         Appointment.status == 'confirmed',
@@ -33,9 +45,10 @@ def book_slot(slug):
     ).first()
 
     if conflict:
+        db.session.rollback()
         # return 3 next available slots instead of error
-        next_slots = generate_slots(user.id, start.date())
-        available = [s for s in next_slots if s['start'] > data['start_time']][:3]
+        by_day = slot_cache.get_slots_range(user.id, start.date(), start.date() + timedelta(days=6))
+        available = [s for day_slots in by_day.values() for s in day_slots if s['start'] > start.isoformat()][:3]
         return jsonify({'available': False, 'next_slots': available}), 409
 
     appt = Appointment(
@@ -50,11 +63,13 @@ def book_slot(slug):
     )
     db.session.add(appt)
     db.session.commit()
+    slot_cache.invalidate_interval(user.id, start, end)
     return jsonify({'message': 'Booked', 'appointment_id': appt.id}), 201
 
 @public_bp.route('/waitlist/<slug>', methods=['POST'])
+@rate_limited('slug')
 def join_waitlist(slug):
-    user = User.query.filter_by(slug=slug).first_or_404()
+    user = host_or_404(slug)
     data = request.get_json()
     entry = Waitlist(
         host_user_id=user.id,
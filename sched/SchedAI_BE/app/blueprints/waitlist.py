@@ -2,24 +2,27 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Waitlist
+from app.services.serializers import Projection, json_response
 
 waitlist_bp = Blueprint('waitlist', __name__, url_prefix='/waitlist')
 
+WAITLIST_ENTRY = Projection([
+    ('id', Waitlist.id),
+    ('guest_name', Waitlist.guest_name),
+    ('guest_email', Waitlist.guest_email),
+    ('guest_reason', Waitlist.guest_reason),
+    ('preferred_start', Waitlist.preferred_start),
+    ('preferred_end', Waitlist.preferred_end),
+    ('status', Waitlist.status),
+    ('created_at', Waitlist.created_at)
+])
+
 @waitlist_bp.route('', methods=['GET'])
 @jwt_required()
 def get_waitlist():
     user_id = int(get_jwt_identity())
-    entries = Waitlist.query.filter_by(host_user_id=user_id).all()
-    return jsonify([{
-        'id': e.id,
-        'guest_name': e.guest_name,
-        'guest_email': e.guest_email,
-        'guest_reason': e.guest_reason,
-        'preferred_start': e.preferred_start.isoformat(),
-        'preferred_end': e.preferred_end.isoformat(),
-        'status': e.status,
-        'created_at': e.created_at.isoformat()
-    } for e in entries]), 200
+    rows = Waitlist.query.with_entities(*WAITLIST_ENTRY.columns).filter_by(host_user_id=user_id).all()
+    return json_response(WAITLIST_ENTRY.dump_rows(rows))
 
 @waitlist_bp.route('/<int:entry_id>', methods=['DELETE'])
 @jwt_required()
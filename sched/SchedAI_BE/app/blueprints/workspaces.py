@@ -2,11 +2,28 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from app import db
 from app.models import Workspace, WorkspaceMember, User, Appointment
+from app.services.slot_cache import slot_cache
+from app.services import calendar_version
+from app.services.slot_generator import SLOT_MINUTES
+from app.services.team_availability import common_slots
+from app.services.serializers import Projection, json_response, key_case
+from sqlalchemy import and_
 from datetime import date, datetime, timedelta
 import random, string
 
 workspaces_bp = Blueprint('workspaces', __name__, url_prefix='/workspaces')
 
+MEMBER = Projection([
+    ('user_id', User.id),
+    ('name', User.name),
+    ('slug', User.slug),
+    ('role', WorkspaceMember.role)
+])
+BUSY = Projection([
+    ('start', Appointment.start_time),
+    ('end', Appointment.end_time)
+])
+
 def generate_invite_code():
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=8))
 
@@ -42,26 +59,57 @@ def join_workspace():
 @workspaces_bp.route('/<int:ws_id>/members', methods=['GET'])
 @jwt_required()
 def get_members(ws_id):
-    members = WorkspaceMember.query.filter_by(workspace_id=ws_id).all()
-    result = []
-    for m in members:
-        user = User.query.get(m.user_id)
-        today_start = datetime.combine(date.today(), datetime.min.time())
-        today_end = today_start + timedelta(days=1)
-        appts = Appointment.query.filter(
-            Appointment.host_user_id == user.id,
-            Appointment.start_time >= today_start,
-            Appointment.start_time < today_end,
-            Appointment.status == 'confirmed'
-        ).all()
-        result.append({
-            'user_id': user.id,
-            'name': user.name,
-            'slug': user.slug,
-            'role': m.role,
-            'appointments_today': [{'start': a.start_time.isoformat(), 'end': a.end_time.isoformat()} for a in appts]
-        })
-    return jsonify(result), 200
+    today_start = datetime.combine(date.today(), datetime.min.time())
+    today_end = today_start + timedelta(days=1)
+    # one query for every member and today's appointments; members without
+    # any come back once with NULL appointment columns
+    rows = db.session.query(
+        WorkspaceMember.id, *MEMBER.columns, *BUSY.columns
+    ).join(User, User.id == WorkspaceMember.user_id).outerjoin(Appointment, and_(
+        Appointment.host_user_id == User.id,
+        Appointment.start_time >= today_start,
+        Appointment.start_time < today_end,
+        Appointment.status == 'confirmed'
+    )).filter(WorkspaceMember.workspace_id == ws_id).order_by(
+        WorkspaceMember.id, Appointment.start_time
+    ).all()
+
+    members, busy = {}, {}
+    width = len(MEMBER.fields) + 1
+    for row in rows:
+        if row[0] not in members:
+            members[row[0]] = row[1:width]
+            busy[row[0]] = []
+        if row[width] is not None:
+            busy[row[0]].append(row[width:])
+
+    case = key_case()
+    today_key = 'appointmentsToday' if case == 'camel' else 'appointments_today'
+    result = MEMBER.dump_rows(members.values(), case)
+    for member, appts in zip(result, busy.values()):
+        member[today_key] = BUSY.dump_rows(appts, case)
+    return json_response(result)
+
+@workspaces_bp.route('/<int:ws_id>/common-slots', methods=['GET'])
+@jwt_required()
+def get_common_slots(ws_id):
+    # ?start=&end= (inclusive, YYYY-MM-DD, default the next 7 days) and
+    # ?duration= minutes a window must last to be returned
+    start_str = request.args.get('start')
+    start_date = datetime.strptime(start_str, '%Y-%m-%d').date() if start_str else date.today()
+    end_str = request.args.get('end')
+    end_date = datetime.strptime(end_str, '%Y-%m-%d').date() if end_str else start_date + timedelta(days=6)
+    if end_date < start_date or (end_date - start_date).days > 61:
+        return jsonify({'error': 'Range must be between 1 and 62 days'}), 400
+    duration = request.args.get('duration', SLOT_MINUTES, type=int)
+
+    user_ids = [m.user_id for m in WorkspaceMember.query.with_entities(WorkspaceMember.user_id).filter_by(workspace_id=ws_id)]
+    if int(get_jwt_identity()) not in user_ids:
+        return jsonify({'error': 'Not a member of this workspace'}), 403
+    return jsonify({
+        'members': len(user_ids),
+        'slots': common_slots(user_ids, start_date, end_date, duration)
+    }), 200
 
 @workspaces_bp.route('/seed-calendar', methods=['POST'])
 @jwt_required()
@@ -100,5 +148,7 @@ def seed_calendar():
             status='confirmed'
         )
         db.session.add(appt)
+    calendar_version.bump(user_id)
     db.session.commit()
+    slot_cache.invalidate_host(user_id)
     return jsonify({'message': f'Added {len(fake)} appointments starting March 1, 2026'}), 200
\ No newline at end of file
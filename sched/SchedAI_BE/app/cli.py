@@ -0,0 +1,134 @@
+import click
+from datetime import datetime, timedelta
+from flask_migrate import upgrade
+from app import db
+from sqlalchemy import exists
+from app.models import User, AIJob, AvailabilityRule, AvailabilityBitmap, Appointment, Transcript, TranscriptSegment, Waitlist
+from app.services.availability_bitmap import compile_users, store
+from app.services.slot_cache import slot_cache
+from app.services.waitlist_checker import expire_waitlist
+from app.services.webhook_dispatcher import dispatcher
+from app.services.slugs import prefix_match
+
+def hot_queries():
+    # (name, query, indexes the plan may use); mirror the filters used by the
+    # services and blueprints so a dropped or unusable index shows up here
+    now = datetime(2026, 3, 2, 9, 0)
+    return [
+        ('slots: appointments in window', Appointment.query.filter(
+            Appointment.host_user_id == 1,
+            Appointment.status == 'confirmed',
+            Appointment.start_time < now + timedelta(days=7),
+            Appointment.end_time > now
+        ).order_by(Appointment.start_time), {'ix_appointments_confirmed_host_start', 'ix_appointments_host_status_start'}),
+        ('appointments: week listing', Appointment.query.filter(
+            Appointment.host_user_id == 1,
+            Appointment.start_time >= now,
+            Appointment.start_time < now + timedelta(days=7)
+        ), {'ix_appointments_host_status_start', 'ix_appointments_host_start_id'}),
+        ('appointments: range page', Appointment.query.filter(
+            Appointment.host_user_id == 1,
+            Appointment.start_time >= now,
+            Appointment.start_time < now + timedelta(days=90)
+        ).order_by(Appointment.start_time, Appointment.id).limit(101), {'ix_appointments_host_start_id'}),
+        ('n8n: upcoming reminders', Appointment.query.filter(
+            Appointment.status == 'confirmed',
+            Appointment.guest_email != None,
+            Appointment.start_time >= now,
+            Appointment.start_time < now + timedelta(days=2)
+        ).order_by(Appointment.start_time, Appointment.id), {'ix_appointments_status_start_id'}),
+        ('slots: availability rules', AvailabilityRule.query.filter(
+            AvailabilityRule.user_id == 1,
+            AvailabilityRule.day_of_week.in_([0, 1, 2]),
+            AvailabilityRule.is_bookable == True
+        ).order_by(AvailabilityRule.start_time), {'ix_availability_rules_user_day'}),
+        ('slots: availability bitmaps', AvailabilityBitmap.query.filter(
+            AvailabilityBitmap.user_id.in_([1, 2, 3])
+        ), {'INTEGER PRIMARY KEY'}),
+        ('waitlist: entries overlapping freed interval', Waitlist.query.filter(
+            Waitlist.host_user_id == 1,
+            Waitlist.status == 'waiting',
+            Waitlist.preferred_start < now + timedelta(minutes=30),
+            Waitlist.preferred_end > now
+        ).order_by(Waitlist.created_at), {'ix_waitlist_host_status_window'}),
+        ('ai: active jobs', AIJob.query.filter(
+            AIJob.status.in_(['queued', 'running']),
+            AIJob.created_at >= now - timedelta(minutes=30)
+        ), {'ix_ai_jobs_status_created'}),
+        ('transcripts: latest for appointment', Transcript.query.filter_by(
+            appointment_id=1
+        ).order_by(Transcript.created_at.desc()).limit(1), {'ix_transcripts_appointment_created'}),
+        ('transcripts: last segment', TranscriptSegment.query.filter_by(
+            appointment_id=1
+        ).order_by(TranscriptSegment.seq.desc()).limit(1), {'sqlite_autoindex_transcript_segments_1'}),
+        ('transcripts: segments in range', TranscriptSegment.query.filter(
+            TranscriptSegment.appointment_id == 1,
+            TranscriptSegment.offset + TranscriptSegment.length > 1000,
+            TranscriptSegment.offset < 2000
+        ).order_by(TranscriptSegment.seq), {'ix_transcript_segments_appointment_offset', 'sqlite_autoindex_transcript_segments_1'}),
+        ('public: user by slug', User.query.filter_by(slug='johnsmith'), {'sqlite_autoindex_users_2'}),
+        ('auth: slugs taken from a base', User.query.filter(prefix_match('johnsmith')),
+         {'sqlite_autoindex_users_2', 'ix_users_slug_prefix'}),
+    ]
+
+def explain(query):
+    compiled = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'render_postcompile': True})
+    params = tuple(compiled.params[name] for name in compiled.positiontup)
+    with db.engine.connect() as conn:
+        return [row[-1] for row in conn.exec_driver_sql('EXPLAIN QUERY PLAN ' + compiled.string, params)]
+
+@click.command('check-query-plans')
+def check_query_plans():
+    """Fail if a hot-path query stops using its index (SQLite only)."""
+    if db.engine.dialect.name != 'sqlite':
+        raise click.ClickException('run against SQLite, e.g. DATABASE_URL=sqlite:// flask check-query-plans')
+    upgrade()
+    failed = 0
+    for name, query, indexes in hot_queries():
+        plan = explain(query)
+        full_scan = any(step.startswith('SCAN') and 'INDEX' not in step for step in plan)
+        uses_index = any(index in step for step in plan for index in indexes)
+        ok = uses_index and not full_scan
+        failed += not ok
+        click.echo(f"{'ok  ' if ok else 'FAIL'} {name}: {' | '.join(plan)}")
+    if failed:
+        raise click.ClickException(f'{failed} hot queries are not using an index')
+
+@click.command('expire-waitlist')
+def expire_waitlist_command():
+    """Mark waitlist entries whose preferred window has passed as expired."""
+    expired = expire_waitlist()
+    db.session.commit()
+    click.echo(f'{expired} waitlist entries expired')
+
+@click.command('dispatch-webhooks')
+@click.option('--once', is_flag=True, help='Drain the due outbox rows once and exit.')
+def dispatch_webhooks(once):
+    """Deliver queued n8n webhooks from the outbox."""
+    if once:
+        click.echo(f'{dispatcher.drain()} webhooks processed')
+        return
+    dispatcher.run()
+
+@click.command('compile-availability')
+@click.option('--all', 'recompile', is_flag=True, help='Recompile users that already have a bitmap.')
+@click.option('--batch', default=500, show_default=True)
+def compile_availability(recompile, batch):
+    """Store availability bitmaps for users whose rules predate them."""
+    query = db.session.query(AvailabilityRule.user_id).distinct()
+    if not recompile:
+        query = query.filter(~exists().where(AvailabilityBitmap.user_id == AvailabilityRule.user_id))
+    user_ids = sorted(row.user_id for row in query)
+    for i in range(0, len(user_ids), batch):
+        for user_id, week in compile_users(user_ids[i:i + batch]).items():
+            store(user_id, week)
+        db.session.commit()
+    for user_id in user_ids:
+        slot_cache.invalidate_host(user_id)
+    click.echo(f'{len(user_ids)} availability bitmaps compiled')
+
+def register_cli(app):
+    app.cli.add_command(check_query_plans)
+    app.cli.add_command(expire_waitlist_command)
+    app.cli.add_command(dispatch_webhooks)
+    app.cli.add_command(compile_availability)
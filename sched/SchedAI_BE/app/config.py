@@ -6,5 +6,56 @@ load_dotenv()
 class Config:
     SQLALCHEMY_DATABASE_URI = os.getenv('DATABASE_URL', 'postgresql://localhost/schedai')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # SQLite uses its own single-connection pools, which take none of these
+    SQLALCHEMY_ENGINE_OPTIONS = {} if SQLALCHEMY_DATABASE_URI.startswith('sqlite') else {
+        'pool_size': int(os.getenv('DB_POOL_SIZE', 5)),
+        'max_overflow': int(os.getenv('DB_MAX_OVERFLOW', 10)),
+        'pool_timeout': int(os.getenv('DB_POOL_TIMEOUT', 30)),
+        'pool_recycle': int(os.getenv('DB_POOL_RECYCLE', 1800)),
+        'pool_pre_ping': os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true',
+    }
     JWT_SECRET_KEY = os.getenv('JWT_SECRET', 'dev-secret')
-    SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
\ No newline at end of file
+    SECRET_KEY = os.getenv('SECRET_KEY', 'dev')
+    SLOT_CACHE_URL = os.getenv('SLOT_CACHE_URL')
+    SLOT_CACHE_MAX_ENTRIES = int(os.getenv('SLOT_CACHE_MAX_ENTRIES', 4096))
+    SLOT_CACHE_TTL = int(os.getenv('SLOT_CACHE_TTL', 86400))
+    AVAILABILITY_CACHE_MAX_ENTRIES = int(os.getenv('AVAILABILITY_CACHE_MAX_ENTRIES', 4096))
+    N8N_WEBHOOK_URL = os.getenv('N8N_WEBHOOK_URL', '')
+    WEBHOOK_BATCH_SIZE = int(os.getenv('WEBHOOK_BATCH_SIZE', 50))
+    WEBHOOK_MAX_ATTEMPTS = int(os.getenv('WEBHOOK_MAX_ATTEMPTS', 8))
+    WEBHOOK_BACKOFF_SECONDS = float(os.getenv('WEBHOOK_BACKOFF_SECONDS', 5))
+    WEBHOOK_POLL_SECONDS = float(os.getenv('WEBHOOK_POLL_SECONDS', 2))
+    WEBHOOK_TIMEOUT = float(os.getenv('WEBHOOK_TIMEOUT', 5))
+    WEBHOOK_LEASE_SECONDS = int(os.getenv('WEBHOOK_LEASE_SECONDS', 600))
+    CLAUDE_CACHE_TTL = int(os.getenv('CLAUDE_CACHE_TTL', 86400))
+    CLAUDE_CACHE_MAX_ENTRIES = int(os.getenv('CLAUDE_CACHE_MAX_ENTRIES', 1024))
+    CLAUDE_CACHE_MAX_ROWS = int(os.getenv('CLAUDE_CACHE_MAX_ROWS', 10000))
+    CLAUDE_CACHE_PERSIST = os.getenv('CLAUDE_CACHE_PERSIST', 'true').lower() == 'true'
+    AI_JOB_WORKERS = int(os.getenv('AI_JOB_WORKERS', 4))
+    AI_JOB_MAX_PENDING = int(os.getenv('AI_JOB_MAX_PENDING', 100))
+    AI_JOB_MAX_PER_USER = int(os.getenv('AI_JOB_MAX_PER_USER', 2))
+    AI_JOB_STALE_SECONDS = int(os.getenv('AI_JOB_STALE_SECONDS', 1800))
+    DEBRIEF_CHUNK_CHARS = int(os.getenv('DEBRIEF_CHUNK_CHARS', 12000))
+    DEBRIEF_CHUNK_WORKERS = int(os.getenv('DEBRIEF_CHUNK_WORKERS', 4))
+    ICS_FEED_PAST_DAYS = int(os.getenv('ICS_FEED_PAST_DAYS', 30))
+    ICS_FEED_FUTURE_DAYS = int(os.getenv('ICS_FEED_FUTURE_DAYS', 180))
+    ICS_CACHE_MAX_ENTRIES = int(os.getenv('ICS_CACHE_MAX_ENTRIES', 256))
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 500))
+    METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+    PROXY_FIX_HOPS = int(os.getenv('PROXY_FIX_HOPS', 0))
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_URL = os.getenv('RATE_LIMIT_URL')
+    RATE_LIMIT_IP_RATE = float(os.getenv('RATE_LIMIT_IP_RATE', 5))
+    RATE_LIMIT_IP_BURST = float(os.getenv('RATE_LIMIT_IP_BURST', 30))
+    RATE_LIMIT_TARGET_RATE = float(os.getenv('RATE_LIMIT_TARGET_RATE', 20))
+    RATE_LIMIT_TARGET_BURST = float(os.getenv('RATE_LIMIT_TARGET_BURST', 100))
+    PUBLIC_CACHE_TTL = int(os.getenv('PUBLIC_CACHE_TTL', 5))
+    PUBLIC_CACHE_STALE = int(os.getenv('PUBLIC_CACHE_STALE', 5))
+    PUBLIC_CACHE_MAX_ENTRIES = int(os.getenv('PUBLIC_CACHE_MAX_ENTRIES', 2048))
+    BCRYPT_LOG_ROUNDS = int(os.getenv('BCRYPT_LOG_ROUNDS', 12))
+    PASSWORD_HASH_WORKERS = int(os.getenv('PASSWORD_HASH_WORKERS', 1))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv('PASSWORD_HASH_MAX_PENDING', 2))
+    PASSWORD_HASH_TIMEOUT = int(os.getenv('PASSWORD_HASH_TIMEOUT', 5))
+    SLUG_CACHE_TTL = int(os.getenv('SLUG_CACHE_TTL', 60))
+    SLUG_CACHE_MISS_TTL = int(os.getenv('SLUG_CACHE_MISS_TTL', 5))
+    SLUG_CACHE_MAX_ENTRIES = int(os.getenv('SLUG_CACHE_MAX_ENTRIES', 10000))
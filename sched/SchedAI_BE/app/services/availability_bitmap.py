@@ -0,0 +1,200 @@
+import struct
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from app import db
+from app.models import AvailabilityRule, AvailabilityBitmap
+
+# A user's bookable rules compiled into bitmaps over the week, one bit per
+# minute from Monday 00:00 (bit 0). Compiled on save, stored in
+# availability_bitmaps and cached per worker. Appointments are rasterized onto
+# the same grid for a date window, so slot and free-time questions become a
+# few shifts, ANDs and ORs on Python ints instead of walking timedeltas.
+#
+# Minutes rather than quarter hours because rules take any HH:MM and
+# appointments any time; at this grid the answers match the interval maths
+# exactly, and a week is still only 1260 bytes.
+
+SLOT_MINUTES = 30
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+WEEK_BYTES = WEEK_MINUTES // 8
+DAY_MASK = (1 << DAY_MINUTES) - 1
+MINUTE = timedelta(minutes=1)
+
+def span(start, end):
+    # bits start .. end-1
+    return ((1 << (end - start)) - 1) << start if end > start else 0
+
+def spread(bits, width):
+    # bit m is set iff any of bits m .. m+width-1 is: "busy somewhere in the
+    # slot starting at m", by doubling instead of width shifts
+    covered, reach = bits, 1
+    while reach * 2 <= width:
+        covered |= covered >> reach
+        reach *= 2
+    if reach < width:
+        covered |= covered >> (width - reach)
+    return covered
+
+def set_bits(bits):
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+def runs(bits):
+    # (start, end) of every run of set bits, lowest first
+    while bits:
+        low = bits & -bits
+        filled = bits + low  # carries through the run and stops just past it
+        yield low.bit_length() - 1, (filled & -filled).bit_length() - 1
+        bits &= filled
+
+def tile(week_bits, days):
+    # weekly bits laid over consecutive days, day i starting at bit i*1440
+    out = 0
+    for i, d in enumerate(days):
+        out |= ((week_bits >> (d.weekday() * DAY_MINUTES)) & DAY_MASK) << (i * DAY_MINUTES)
+    return out
+
+def minutes_since(origin, moment, ceil=False):
+    delta = moment - origin
+    return -(-delta // MINUTE) if ceil else delta // MINUTE
+
+def rasterize(intervals, window_start, window_minutes, buffer_minutes=0):
+    # busy bits over the window for (start, end) pairs, each extended by the
+    # buffer; partial minutes count as busy, so overlap tests stay exact for
+    # minute-aligned slots. A zero-length appointment without buffer blocks
+    # nothing.
+    bits = 0
+    for start, end in intervals:
+        first = max(0, minutes_since(window_start, start))
+        last = min(window_minutes, minutes_since(window_start, end, ceil=True) + buffer_minutes)
+        bits |= span(first, last)
+    return bits
+
+
+class WeeklyAvailability:
+    __slots__ = ('open', 'starts', 'buffers')
+
+    def __init__(self, open_bits=0, starts=None, buffers=(0,) * 7):
+        self.open = open_bits  # inside some bookable rule
+        self.starts = starts or {}  # {buffer minutes: bits where a rule's slot starts}
+        self.buffers = tuple(buffers)  # largest rule buffer per weekday
+
+    @classmethod
+    def compile(cls, rules, slot_minutes=SLOT_MINUTES):
+        # rules: objects with day_of_week, start_time, end_time and
+        # buffer_minutes; slots step from each rule's own start time
+        week = cls()
+        buffers = [0] * 7
+        for rule in rules:
+            if not 0 <= rule.day_of_week <= 6:
+                continue
+            day = rule.day_of_week * DAY_MINUTES
+            start = day + rule.start_time.hour * 60 + rule.start_time.minute
+            end = day + rule.end_time.hour * 60 + rule.end_time.minute
+            buffer = rule.buffer_minutes or 0
+            week.open |= span(start, end)
+            starts = 0
+            for minute in range(start, end - slot_minutes + 1, slot_minutes):
+                starts |= 1 << minute
+            week.starts[buffer] = week.starts.get(buffer, 0) | starts
+            buffers[rule.day_of_week] = max(buffers[rule.day_of_week], buffer)
+        week.buffers = tuple(buffers)
+        return week
+
+    def to_bytes(self):
+        parts = [struct.pack('>7H', *self.buffers), self.open.to_bytes(WEEK_BYTES, 'little')]
+        for buffer, starts in sorted(self.starts.items()):
+            parts.append(struct.pack('>H', buffer) + starts.to_bytes(WEEK_BYTES, 'little'))
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data):
+        buffers = struct.unpack_from('>7H', data)
+        offset = struct.calcsize('>7H')
+        open_bits = int.from_bytes(data[offset:offset + WEEK_BYTES], 'little')
+        offset += WEEK_BYTES
+        starts = {}
+        while offset < len(data):
+            (buffer,) = struct.unpack_from('>H', data, offset)
+            starts[buffer] = int.from_bytes(data[offset + 2:offset + 2 + WEEK_BYTES], 'little')
+            offset += 2 + WEEK_BYTES
+        return cls(open_bits, starts, buffers)
+
+    def max_buffer(self, days):
+        return max((self.buffers[d.weekday()] for d in days), default=0)
+
+
+def compile_users(user_ids):
+    # straight from the rules table, for users without a stored bitmap
+    rules = AvailabilityRule.query.filter(
+        AvailabilityRule.user_id.in_(user_ids),
+        AvailabilityRule.is_bookable == True
+    ).all()
+    by_user = {user_id: [] for user_id in user_ids}
+    for rule in rules:
+        by_user[rule.user_id].append(rule)
+    return {user_id: WeeklyAvailability.compile(user_rules) for user_id, user_rules in by_user.items()}
+
+def store(user_id, week):
+    # joins the caller's transaction, so it commits together with the rules
+    db.session.merge(AvailabilityBitmap(user_id=user_id, week=week.to_bytes(), compiled_at=datetime.utcnow()))
+
+
+class BitmapCache:
+    # Decoded weekly bitmaps keyed by (user, slot cache generation): saving
+    # availability bumps the generation, so with a shared slot cache every
+    # worker reloads on its next lookup.
+    def __init__(self):
+        self.max_entries = 4096
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('AVAILABILITY_CACHE_MAX_ENTRIES', self.max_entries)
+
+    def weekly(self, user_ids):
+        # imported here: slot_cache imports the slot generator, which uses this
+        from app.services.slot_cache import slot_cache
+        generations = slot_cache.generations(user_ids)
+        found, missing = {}, []
+        with self._lock:
+            for user_id in user_ids:
+                key = (user_id, generations[user_id])
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    found[user_id] = self._entries[key]
+                else:
+                    missing.append(user_id)
+            self.hits += len(found)
+            self.misses += len(missing)
+        if not missing:
+            return found
+
+        loaded = {}
+        for row in AvailabilityBitmap.query.filter(AvailabilityBitmap.user_id.in_(missing)):
+            loaded[row.user_id] = WeeklyAvailability.from_bytes(row.week)
+        # saved before bitmaps existed, or bulk-loaded: compile from the rules
+        # (flask compile-availability stores them)
+        uncompiled = [u for u in missing if u not in loaded]
+        if uncompiled:
+            loaded.update(compile_users(uncompiled))
+
+        with self._lock:
+            for user_id, week in loaded.items():
+                self._entries[(user_id, generations[user_id])] = week
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        found.update(loaded)
+        return found
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+bitmap_cache = BitmapCache()
@@ -0,0 +1,23 @@
+from datetime import datetime
+from app import db
+from app.models import User
+
+# Per-host counter bumped inside every transaction that changes the host's
+# appointments. Listings derive their ETag from it, so a poll of an unchanged
+# calendar costs one primary-key lookup instead of a query and serialization.
+#
+# The update also row-locks the host until the transaction ends, so calling
+# bump() *before* checking for conflicts makes check-then-insert atomic per
+# host: a concurrent booking for the same host waits here and then sees the
+# committed appointment, while other hosts are not blocked at all. Paths that
+# bail out after bumping must roll back to release the lock.
+
+def bump(host_user_id):
+    # joins the caller's transaction, so the version only moves if the change commits
+    User.query.filter_by(id=host_user_id).update(
+        {User.calendar_version: User.calendar_version + 1, User.calendar_updated_at: datetime.utcnow()},
+        synchronize_session=False
+    )
+
+def current(host_user_id):
+    return db.session.query(User.calendar_version).filter_by(id=host_user_id).scalar() or 0
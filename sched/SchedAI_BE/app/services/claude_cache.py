@@ -0,0 +1,203 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import SQLAlchemyError
+from app import db
+from app.models import AIResponseCache
+
+class _Flight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class ClaudeCache:
+    # Two tiers: a bounded in-process LRU and the ai_response_cache table,
+    # which survives restarts and is shared between workers. Concurrent
+    # identical requests wait on the first one instead of calling upstream.
+    def __init__(self):
+        self.ttl = 86400
+        self.max_entries = 1024
+        self.max_rows = 10000
+        self.persist = True
+        self._memory = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._writes = 0
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.upstream_seconds = 0.0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('CLAUDE_CACHE_TTL', self.ttl)
+        self.max_entries = app.config.get('CLAUDE_CACHE_MAX_ENTRIES', self.max_entries)
+        self.max_rows = app.config.get('CLAUDE_CACHE_MAX_ROWS', self.max_rows)
+        self.persist = app.config.get('CLAUDE_CACHE_PERSIST', self.persist)
+
+    @staticmethod
+    def key(params):
+        return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()
+
+    def get_or_call(self, params, call):
+        key = self.key(params)
+        with self._lock:
+            value = self._memory_get(key)
+            if value is not None:
+                self.memory_hits += 1
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = _Flight()
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error:
+                raise flight.error
+            return flight.value
+
+        try:
+            value = self._persistent_get(key)
+            if value is not None:
+                self.persistent_hits += 1
+            else:
+                self.misses += 1
+                started = time.perf_counter()
+                value = call()
+                self.upstream_seconds += time.perf_counter() - started
+                self._persistent_set(key, value)
+            with self._lock:
+                self._memory_set(key, value)
+            flight.value = value
+            return value
+        except Exception as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.event.set()
+
+    def lookup(self, params):
+        # non-coalescing read for callers that can't share a flight (streaming)
+        key = self.key(params)
+        with self._lock:
+            value = self._memory_get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+        value = self._persistent_get(key)
+        if value is not None:
+            self.persistent_hits += 1
+            with self._lock:
+                self._memory_set(key, value)
+        return value
+
+    def store(self, params, value, upstream_seconds=0.0):
+        key = self.key(params)
+        self.misses += 1
+        self.upstream_seconds += upstream_seconds
+        self._persistent_set(key, value)
+        with self._lock:
+            self._memory_set(key, value)
+
+    def _memory_get(self, key):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= time.time():
+            del self._memory[key]
+            return None
+        self._memory.move_to_end(key)
+        return value
+
+    def _memory_set(self, key, value):
+        self._memory[key] = (value, time.time() + self.ttl)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def _persistent_get(self, key):
+        if not self.persist or not has_app_context():
+            return None
+        table = AIResponseCache.__table__
+        try:
+            with db.engine.connect() as conn:
+                return conn.execute(
+                    select(table.c.response).where(table.c.key == key, table.c.expires_at > datetime.utcnow())
+                ).scalar()
+        except SQLAlchemyError:
+            current_app.logger.exception('could not read cached Claude response %s', key)
+            return None
+
+    def _persistent_set(self, key, value):
+        if not self.persist or not has_app_context():
+            return
+        table = AIResponseCache.__table__
+        now = datetime.utcnow()
+        row = {'key': key, 'response': value, 'created_at': now, 'expires_at': now + timedelta(seconds=self.ttl)}
+        # own transaction, so caching never commits the caller's session; an
+        # upsert, as another worker may have stored the same key meanwhile
+        try:
+            with db.engine.begin() as conn:
+                self._upsert(conn, table, row)
+                self._writes += 1
+                if self._writes % 100 == 0:
+                    self._prune(conn, now)
+        except SQLAlchemyError:
+            # the answer is already paid for: serve it uncached rather than fail
+            current_app.logger.exception('could not persist Claude response %s', key)
+
+    @staticmethod
+    def _upsert(conn, table, row):
+        insert = {'postgresql': postgresql.insert, 'sqlite': sqlite.insert}.get(conn.dialect.name)
+        if insert is None:
+            conn.execute(delete(table).where(table.c.key == row['key']))
+            conn.execute(table.insert().values(**row))
+            return
+        stmt = insert(table).values(**row)
+        conn.execute(stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={name: stmt.excluded[name] for name in ('response', 'created_at', 'expires_at')}
+        ))
+
+    def _prune(self, conn, now):
+        table = AIResponseCache.__table__
+        conn.execute(delete(table).where(table.c.expires_at <= now))
+        excess = conn.execute(select(func.count()).select_from(table)).scalar() - self.max_rows
+        if excess > 0:
+            oldest = select(table.c.key).order_by(table.c.created_at).limit(excess)
+            conn.execute(delete(table).where(table.c.key.in_(oldest)))
+
+    def stats(self):
+        hits = self.memory_hits + self.persistent_hits + self.coalesced
+        lookups = hits + self.misses
+        avg_upstream = self.upstream_seconds / self.misses if self.misses else 0.0
+        return {
+            'memory_hits': self.memory_hits,
+            'persistent_hits': self.persistent_hits,
+            'coalesced': self.coalesced,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'upstream_seconds': round(self.upstream_seconds, 3),
+            'estimated_seconds_saved': round(hits * avg_upstream, 3),
+            'entries': len(self._memory)
+        }
+
+
+claude_cache = ClaudeCache()
@@ -1,12 +1,54 @@
 import anthropic
 import os
+import time
+from typing import Iterator, Union
+from app.services.claude_cache import claude_cache
+from app.services.metrics import metrics
 
 client = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
 
-def call_claude(prompt: str) -> str:
-    message = client.messages.create(
-        model="claude-opus-4-6",
-        max_tokens=1024,
-        messages=[{"role": "user", "content": prompt}]
-    )
-    return message.content[0].text
\ No newline at end of file
+MODEL = "claude-opus-4-6"
+
+def call_claude(prompt: str, max_tokens: int = 1024, cache: bool = True, stream: bool = False) -> Union[str, Iterator[str]]:
+    params = {
+        'model': MODEL,
+        'max_tokens': max_tokens,
+        'messages': [{"role": "user", "content": prompt}]
+    }
+    if stream:
+        return _stream(params, cache)
+    if not cache:
+        return _create(params)
+    return claude_cache.get_or_call(params, lambda: _create(params))
+
+def _create(params) -> str:
+    started = time.perf_counter()
+    try:
+        message = client.messages.create(**params)
+    except Exception:
+        metrics.observe_claude('create', 'error', time.perf_counter() - started)
+        raise
+    metrics.observe_claude('create', 'ok', time.perf_counter() - started, message.usage)
+    return message.content[0].text
+
+def _stream(params, cache) -> Iterator[str]:
+    # yields text as it arrives; a cached response comes back as one chunk
+    if cache:
+        cached = claude_cache.lookup(params)
+        if cached is not None:
+            yield cached
+            return
+    started = time.perf_counter()
+    parts = []
+    try:
+        with client.messages.stream(**params) as response:
+            for text in response.text_stream:
+                parts.append(text)
+                yield text
+            usage = response.get_final_message().usage
+    except Exception:
+        metrics.observe_claude('stream', 'error', time.perf_counter() - started)
+        raise
+    metrics.observe_claude('stream', 'ok', time.perf_counter() - started, usage)
+    if cache:
+        claude_cache.store(params, ''.join(parts), time.perf_counter() - started)
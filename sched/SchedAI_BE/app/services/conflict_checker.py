@@ -1,50 +1,67 @@
+from bisect import bisect_left
 from datetime import timedelta
 from app.models import Appointment
 
+BACK_TO_BACK_GAP = timedelta(minutes=5)
+
 def check_conflicts(host_user_id, start_time, end_time, exclude_id=None):
-    query = Appointment.query.filter(
-        Appointment.host_user_id == host_user_id,
-        Appointment.status == 'confirmed',
-        Appointment.start_time < end_time,
-        Appointment.end_time > start_time
-    )
-    if exclude_id:
-        query = query.filter(Appointment.id != exclude_id)
+    return check_conflicts_many(host_user_id, [(start_time, end_time, exclude_id)])[0]
 
-    overlapping = query.all()
-    if overlapping:
-        return {'conflict': True, 'type': 'double_booking'}
+def check_conflicts_many(host_user_id, proposals):
+    # proposals are (start_time, end_time) or (start_time, end_time, exclude_id)
+    # tuples; each one is checked independently against the stored calendar
+    proposals = [tuple(p) + (None,) * (3 - len(p)) for p in proposals]
+    if not proposals:
+        return []
 
-    # check 3+ back to back
-    day_start = start_time.replace(hour=0, minute=0, second=0)
-    day_end = day_start + timedelta(days=1)
-    day_appts = Appointment.query.filter(
+    window_start = min(_day_start(s) for s, e, _ in proposals)
+    window_end = max(max(_day_start(s) + timedelta(days=1), e) for s, e, _ in proposals)
+    appts = Appointment.query.with_entities(
+        Appointment.id, Appointment.start_time, Appointment.end_time, Appointment.type
+    ).filter(
         Appointment.host_user_id == host_user_id,
         Appointment.status == 'confirmed',
-        Appointment.start_time >= day_start,
-        Appointment.start_time < day_end
+        Appointment.start_time < window_end,
+        Appointment.end_time > window_start
     ).order_by(Appointment.start_time).all()
 
-    if len(day_appts) >= 2:
-        back_to_back = 0
-        for i in range(len(day_appts) - 1):
-            gap = (day_appts[i+1].start_time - day_appts[i].end_time).total_seconds() / 60
-            if gap <= 5:
-                back_to_back += 1
-                if back_to_back >= 2:
-                    return {'conflict': True, 'type': 'back_to_back'}
-            else:
-                back_to_back = 0
-
-    # check focus block clash
-    focus_clash = Appointment.query.filter(
-        Appointment.host_user_id == host_user_id,
-        Appointment.type == 'focus',
-        Appointment.status == 'confirmed',
-        Appointment.start_time < end_time,
-        Appointment.end_time > start_time
-    ).first()
-    if focus_clash:
-        return {'conflict': True, 'type': 'focus_clash'}
+    starts = [a.start_time for a in appts]
+    longest = max((a.end_time - a.start_time for a in appts), default=timedelta(0))
+    return [_evaluate(appts, starts, longest, *p) for p in proposals]
+
+def _day_start(dt):
+    return dt.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def _evaluate(appts, starts, longest, start_time, end_time, exclude_id):
+    # only appointments starting within `longest` of the proposal can reach it
+    lo = bisect_left(starts, start_time - longest)
+    hi = bisect_left(starts, end_time)
+    overlapping = [a for a in appts[lo:hi] if a.end_time > start_time and a.id != exclude_id]
+    if overlapping:
+        if all(a.type == 'focus' for a in overlapping):
+            return {'conflict': True, 'type': 'focus_clash'}
+        return {'conflict': True, 'type': 'double_booking'}
+
+    # check 3+ back to back: grow the chain of near-adjacent appointments
+    # around the proposal, within its day
+    day_start = _day_start(start_time)
+    day = [a for a in appts[bisect_left(starts, day_start):bisect_left(starts, day_start + timedelta(days=1))]
+           if a.id != exclude_id]
+    i = bisect_left([a.start_time for a in day], start_time)
+    chain = 1
+    edge = start_time
+    for a in reversed(day[:i]):
+        if edge - a.end_time > BACK_TO_BACK_GAP:
+            break
+        chain += 1
+        edge = a.start_time
+    edge = end_time
+    for a in day[i:]:
+        if a.start_time - edge > BACK_TO_BACK_GAP:
+            break
+        chain += 1
+        edge = a.end_time
+    if chain >= 3:
+        return {'conflict': True, 'type': 'back_to_back'}
 
-    return {'conflict': False}
\ No newline at end of file
+    return {'conflict': False}
@@ -0,0 +1,113 @@
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+
+# iCalendar (RFC 5545) output for the per-appointment download and the
+# per-host subscription feed. Lines are CRLF-terminated and folded at 75
+# octets; TEXT values are escaped.
+
+PRODID = '-//SchedAI//Calendar Feed//EN'
+UID_DOMAIN = 'schedai'
+BUSY = 'Busy'
+
+def feed_token(secret, user_id):
+    # unlocks titles and reasons on the host's feed; derived from SECRET_KEY,
+    # so rotating the key revokes every subscription link
+    return hmac.new(secret.encode('utf-8'), f'ics-feed:{user_id}'.encode('utf-8'), hashlib.sha256).hexdigest()[:32]
+
+def busy_only(rows):
+    # the slug is public: without the token, only when the host is busy
+    for appt_id, _, _, start_time, end_time, sequence, updated_at in rows:
+        yield appt_id, BUSY, None, start_time, end_time, sequence, updated_at
+
+def escape(text):
+    return (text or '').replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,') \
+        .replace('\r\n', '\\n').replace('\n', '\\n').replace('\r', '\\n')
+
+def fold(line):
+    # split on octet count without cutting a UTF-8 sequence in half;
+    # continuation lines start with a space, which counts towards their 75
+    encoded = line.encode('utf-8')
+    if len(encoded) <= 75:
+        return line + '\r\n'
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1
+        parts.append(encoded[start:end].decode('utf-8'))
+        start, limit = end, 74
+    return '\r\n '.join(parts) + '\r\n'
+
+def stamp(value):
+    return value.strftime('%Y%m%dT%H%M%SZ')
+
+def vevent(appt_id, title, reason, start_time, end_time, sequence=0, updated_at=None):
+    lines = [
+        'BEGIN:VEVENT',
+        f'UID:appointment-{appt_id}@{UID_DOMAIN}',
+        f'SEQUENCE:{sequence or 0}',
+        f'DTSTAMP:{stamp(updated_at or start_time)}',
+        f'DTSTART:{stamp(start_time)}',
+        f'DTEND:{stamp(end_time)}',
+        f'SUMMARY:{escape(title)}',
+    ]
+    if reason:
+        lines.append(f'DESCRIPTION:{escape(reason)}')
+    lines.append('END:VEVENT')
+    return ''.join(fold(line) for line in lines)
+
+def calendar(events, name=None):
+    # generator, so a large feed is streamed event by event
+    header = ['BEGIN:VCALENDAR', 'VERSION:2.0', f'PRODID:{PRODID}', 'CALSCALE:GREGORIAN', 'METHOD:PUBLISH']
+    if name:
+        header.append(f'X-WR-CALNAME:{escape(name)}')
+    yield ''.join(fold(line) for line in header)
+    for event in events:
+        yield vevent(*event)
+    yield fold('END:VCALENDAR')
+
+
+class FeedCache:
+    # Rendered feeds keyed by (host, calendar version, window start, detailed).
+    # A change to the host's appointments bumps the version, so stale entries
+    # are never served and simply age out of the LRU.
+    def __init__(self):
+        self.max_entries = 256
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get('ICS_CACHE_MAX_ENTRIES', self.max_entries)
+
+    def get(self, key):
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key, body):
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stream(self, key, chunks):
+        # pass chunks through to the client, keeping the body once it completes
+        parts = []
+        for chunk in chunks:
+            data = chunk.encode('utf-8')
+            parts.append(data)
+            yield data
+        self.set(key, b''.join(parts))
+
+
+feed_cache = FeedCache()
@@ -0,0 +1,135 @@
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import select
+from app import db
+from app.models import AIJob, User
+from app.services.ai_tasks import optimize_week, generate_debrief
+
+TASKS = {
+    'optimize': optimize_week,
+    'debrief': generate_debrief,
+}
+
+class JobLimitError(Exception):
+    pass
+
+
+class JobQueue:
+    # Runs AI tasks on a bounded thread pool so request workers return at once.
+    # Job state lives in ai_jobs, so any worker process can answer a poll.
+    # A job dies with its worker (recycled, redeployed or crashed), so rows
+    # still queued or running after AI_JOB_STALE_SECONDS are marked failed:
+    # otherwise they would count toward AI_JOB_MAX_PER_USER forever.
+    def __init__(self):
+        self.app = None
+        self._executor = None
+        self._events = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.app = app
+
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.app.config['AI_JOB_WORKERS'], thread_name_prefix='ai-job'
+            )
+        return self._executor
+
+    def submit(self, user_id, kind, params):
+        config = self.app.config
+        # Both limits count queued and running rows, so they hold across
+        # worker processes. The user row lock serialises count-then-insert for
+        # one user (ignored on SQLite); concurrent submits by different users
+        # may overshoot AI_JOB_MAX_PENDING by a few.
+        db.session.execute(select(User.id).where(User.id == user_id).with_for_update())
+        self.expire_stale(user_id, commit=False)
+        active = AIJob.query.filter(
+            AIJob.status.in_(['queued', 'running']),
+            AIJob.created_at >= self.stale_cutoff()
+        )
+        if active.count() >= config['AI_JOB_MAX_PENDING']:
+            # keep any expiries, and release the row lock
+            db.session.commit()
+            raise JobLimitError('Too many AI jobs queued, try again shortly')
+        if active.filter(AIJob.user_id == user_id).count() >= config['AI_JOB_MAX_PER_USER']:
+            db.session.commit()
+            raise JobLimitError('You already have AI jobs running, wait for them to finish')
+        job = AIJob(id=uuid.uuid4().hex, user_id=user_id, kind=kind, params=json.dumps(params))
+        db.session.add(job)
+        db.session.commit()
+        with self._lock:
+            self._events[job.id] = threading.Event()
+        self.executor().submit(self._run, job.id)
+        return job
+
+    def _run(self, job_id):
+        with self.app.app_context():
+            try:
+                job = db.session.get(AIJob, job_id)
+                if job.status != 'queued':
+                    # waited so long it was expired as stale
+                    return
+                job.status = 'running'
+                job.started_at = datetime.utcnow()
+                db.session.commit()
+                try:
+                    result, status = TASKS[job.kind](job.user_id, json.loads(job.params))
+                    job.result = json.dumps(result)
+                    job.status = 'succeeded' if status < 400 else 'failed'
+                    job.error = result.get('error') if status >= 400 else None
+                except Exception as e:
+                    self.app.logger.exception('AI job %s failed', job_id)
+                    db.session.rollback()
+                    job = db.session.get(AIJob, job_id)
+                    job.status = 'failed'
+                    job.error = str(e)
+                job.finished_at = datetime.utcnow()
+                db.session.commit()
+            finally:
+                with self._lock:
+                    event = self._events.pop(job_id, None)
+                if event:
+                    event.set()
+
+    def is_stale(self, job):
+        return job.status in ('queued', 'running') and job.created_at < self.stale_cutoff()
+
+    def stale_cutoff(self):
+        return datetime.utcnow() - timedelta(seconds=self.app.config['AI_JOB_STALE_SECONDS'])
+
+    def expire_stale(self, user_id, commit=True):
+        expired = AIJob.query.filter(
+            AIJob.user_id == user_id,
+            AIJob.status.in_(['queued', 'running']),
+            AIJob.created_at < self.stale_cutoff()
+        ).update({
+            'status': 'failed',
+            'error': 'Job was lost when its worker restarted, submit it again',
+            'finished_at': datetime.utcnow()
+        }, synchronize_session=False)
+        if commit:
+            db.session.commit()
+        return expired
+
+    def wait(self, job_id, timeout):
+        deadline = time.monotonic() + timeout
+        event = self._events.get(job_id)
+        if event:
+            event.wait(timeout)
+        else:
+            # queued on another worker process: fall back to polling the row
+            while time.monotonic() < deadline:
+                db.session.expire_all()
+                if db.session.get(AIJob, job_id).status not in ('queued', 'running'):
+                    break
+                time.sleep(min(0.5, max(deadline - time.monotonic(), 0)))
+        db.session.expire_all()
+        return db.session.get(AIJob, job_id)
+
+
+job_queue = JobQueue()
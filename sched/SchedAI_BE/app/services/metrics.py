@@ -0,0 +1,162 @@
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# In-process request, SQL, Claude and webhook instrumentation, exposed in the
+# Prometheus text format on /metrics. Each gunicorn worker keeps its own
+# numbers; Prometheus sums them when it scrapes every worker's target, or
+# scrape through a single worker for a sampled view.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100, 200, 500)
+MAX_LOGGED_QUERIES = 50
+
+
+class Histogram:
+    def __init__(self, name, help, buckets, labels):
+        self.name, self.help, self.buckets, self.labels = name, help, buckets, labels
+        self._series = {}
+
+    def observe(self, value, *label_values):
+        series = self._series.get(label_values)
+        if series is None:
+            series = self._series[label_values] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        for label_values, (counts, total) in sorted(self._series.items()):
+            labels = _labels(self.labels, label_values)
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="{bound}"}} {cumulative}')
+            cumulative += counts[-1]
+            lines.append(f'{self.name}_bucket{{{labels}{"," if labels else ""}le="+Inf"}} {cumulative}')
+            lines.append(f'{self.name}_sum{{{labels}}} {total}')
+            lines.append(f'{self.name}_count{{{labels}}} {cumulative}')
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help, labels):
+        self.name, self.help, self.labels = name, help, labels
+        self._series = {}
+
+    def inc(self, amount, *label_values):
+        self._series[label_values] = self._series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} counter']
+        for label_values, value in sorted(self._series.items()):
+            lines.append(f'{self.name}{{{_labels(self.labels, label_values)}}} {value}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(names, values):
+    return ','.join(f'{n}="{_escape(v)}"' for n, v in zip(names, values))
+
+
+class Metrics:
+    def __init__(self):
+        self.slow_request_ms = 500
+        self._lock = threading.Lock()
+        self._engine_hooked = False
+        self.requests = Histogram('http_request_duration_seconds', 'Request latency by endpoint.',
+                                  LATENCY_BUCKETS, ('endpoint', 'method', 'status'))
+        self.request_statements = Histogram('http_request_db_statements', 'SQL statements issued per request.',
+                                            COUNT_BUCKETS, ('endpoint',))
+        self.request_db_time = Histogram('http_request_db_seconds', 'Time spent in SQL per request.',
+                                         LATENCY_BUCKETS, ('endpoint',))
+        self.statements = Counter('db_statements_total', 'SQL statements, in and outside requests.', ('context',))
+        self.claude_calls = Histogram('claude_call_duration_seconds', 'Claude API call latency.',
+                                      LATENCY_BUCKETS, ('mode', 'outcome'))
+        self.claude_tokens = Counter('claude_tokens_total', 'Claude tokens used.', ('direction',))
+        self.webhooks = Histogram('webhook_delivery_duration_seconds', 'n8n webhook POST latency.',
+                                  LATENCY_BUCKETS, ('outcome',))
+
+    def init_app(self, app):
+        self.slow_request_ms = app.config.get('SLOW_REQUEST_MS', self.slow_request_ms)
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.add_url_rule('/metrics', 'metrics', self.endpoint)
+        if not self._engine_hooked:
+            # every engine, so statements from background threads count too
+            event.listen(Engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(Engine, 'after_cursor_execute', self._after_cursor_execute)
+            self._engine_hooked = True
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = []
+        g.metrics_statements = 0
+        g.metrics_db_seconds = 0.0
+
+    def _after_request(self, response):
+        # streamed bodies (SSE, NDJSON, ICS) are timed to their first byte
+        started = g.get('metrics_started')
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self.requests.observe(elapsed, endpoint, request.method, response.status_code)
+            self.request_statements.observe(g.metrics_statements, endpoint)
+            self.request_db_time.observe(g.metrics_db_seconds, endpoint)
+        if elapsed * 1000 >= self.slow_request_ms:
+            queries = '\n'.join(f'  {ms:8.2f} ms  {sql}' for sql, ms in g.metrics_queries)
+            current_app.logger.warning(
+                'slow request %s %s -> %s in %.0f ms, %d statements, %.0f ms in SQL%s',
+                request.method, request.full_path.rstrip('?'), response.status_code, elapsed * 1000,
+                g.metrics_statements, g.metrics_db_seconds * 1000, '\n' + queries if queries else ''
+            )
+        return response
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_started', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info['metrics_started'].pop()
+        in_request = has_request_context() and 'metrics_queries' in g
+        with self._lock:
+            self.statements.inc(1, 'request' if in_request else 'background')
+        if in_request:
+            g.metrics_statements += 1
+            g.metrics_db_seconds += elapsed
+            if len(g.metrics_queries) < MAX_LOGGED_QUERIES:
+                g.metrics_queries.append((' '.join(statement.split())[:300], elapsed * 1000))
+
+    def observe_claude(self, mode, outcome, seconds, usage=None):
+        with self._lock:
+            self.claude_calls.observe(seconds, mode, outcome)
+            if usage is not None:
+                self.claude_tokens.inc(usage.input_tokens or 0, 'input')
+                self.claude_tokens.inc(usage.output_tokens or 0, 'output')
+
+    def observe_webhook(self, outcome, seconds):
+        with self._lock:
+            self.webhooks.observe(seconds, outcome)
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in (self.requests, self.request_statements, self.request_db_time, self.statements,
+                           self.claude_calls, self.claude_tokens, self.webhooks):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def endpoint(self):
+        token = current_app.config.get('METRICS_TOKEN')
+        if token and request.headers.get('Authorization') != f'Bearer {token}':
+            return Response('forbidden\n', status=403, mimetype='text/plain')
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Metrics()
@@ -0,0 +1,174 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, copy_current_request_context, current_app, g, make_response, request
+
+# Short-TTL cache of rendered public responses. Identical requests inside the
+# TTL get the stored bytes; concurrent misses wait for the one request that
+# is rendering; once an entry goes stale it is still served for a grace
+# period while a single background render refreshes it.
+#
+# A view calls depends_on(host) while rendering; the entry is then only served
+# while that host's slot cache version is unchanged. Bookings, edits,
+# cancellations and availability saves bump it (in every worker, with a
+# shared slot cache), so a taken slot or a cancelled appointment is never
+# served from here.
+
+class _Entry:
+    def __init__(self, body, status, headers, fresh_until, stale_until, hosts):
+        self.body = body
+        self.status = status
+        self.headers = headers
+        self.stored = time.time()
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+        self.hosts = hosts  # {host id: slot cache version when rendered}
+        self.refreshing = False
+
+
+class MicroCache:
+    def __init__(self):
+        self.ttl = 5
+        self.stale = 5
+        self.max_entries = 2048
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('PUBLIC_CACHE_TTL', self.ttl)
+        self.stale = app.config.get('PUBLIC_CACHE_STALE', self.stale)
+        self.max_entries = app.config.get('PUBLIC_CACHE_MAX_ENTRIES', self.max_entries)
+
+    def depends_on(self, host_id):
+        # imported here: slot_cache pulls in the models
+        from app.services.slot_cache import slot_cache
+        hosts = g.get('micro_cache_hosts')
+        if hosts is not None:
+            hosts[host_id] = slot_cache.version(host_id)
+
+    def _current(self, entry):
+        from app.services.slot_cache import slot_cache
+        return all(slot_cache.version(host_id) == version for host_id, version in entry.hosts.items())
+
+    def _render(self, key, view, args, kwargs):
+        g.micro_cache_hosts = {}
+        resp = make_response(view(*args, **kwargs))
+        hosts = g.pop('micro_cache_hosts', {})
+        if resp.status_code == 200 and not resp.is_streamed:
+            now = time.time()
+            headers = {k: v for k, v in resp.headers.items() if k not in ('Content-Length', 'Cache-Control')}
+            entry = _Entry(resp.get_data(), resp.status_code, headers, now + self.ttl, now + self.ttl + self.stale, hosts)
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return resp
+
+    def _respond(self, entry):
+        resp = Response(entry.body, status=entry.status, headers=entry.headers)
+        resp.headers['Age'] = str(int(time.time() - entry.stored))
+        return resp
+
+    def _guard(self):
+        # set by an outer decorator (rate_limited) that should only act when
+        # this request really renders; returns a response to send instead
+        guard = g.pop('micro_cache_miss_guard', None)
+        return guard() if guard else None
+
+    def serve(self, view, args, kwargs):
+        key = request.full_path
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and not self._current(entry):
+            with self._lock:
+                if self._entries.get(key) is entry:
+                    del self._entries[key]
+            entry = None
+        now = time.time()
+        with self._lock:
+            if entry is not None and now < entry.fresh_until:
+                self.hits += 1
+                return self._respond(entry)
+            if entry is not None and now < entry.stale_until:
+                self.stale_hits += 1
+                revalidate = not entry.refreshing
+                entry.refreshing = True
+                stale = entry
+            else:
+                stale = None
+                flight = self._inflight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                else:
+                    self.coalesced += 1
+
+        if stale is not None:
+            if revalidate:
+                threading.Thread(target=copy_current_request_context(self._refresh),
+                                 args=(key, stale, view, args, kwargs), daemon=True).start()
+            return self._respond(stale)
+
+        if not leader:
+            flight.wait(30)
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None and time.time() < entry.stale_until:
+                return self._respond(entry)
+            # the leader's response wasn't cacheable; render our own
+            return make_response(self._guard() or view(*args, **kwargs))
+
+        try:
+            refused = self._guard()
+            if refused:
+                return make_response(refused)
+            return self._render(key, view, args, kwargs)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            flight.set()
+
+    def _refresh(self, key, stale, view, args, kwargs):
+        try:
+            self._render(key, view, args, kwargs)
+        except Exception:
+            current_app.logger.exception('micro-cache refresh failed for %s', key)
+        finally:
+            stale.refreshing = False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'coalesced': self.coalesced,
+            'entries': len(self._entries)
+        }
+
+
+micro_cache = MicroCache()
+
+
+def micro_cached(view):
+    # caches 200 responses of an unauthenticated GET view by path and query
+    # string, and tells browsers and CDNs they may do the same
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        resp = micro_cache.serve(view, args, kwargs)
+        if resp.status_code == 200:
+            resp.headers['Cache-Control'] = f'public, max-age={micro_cache.ttl}, stale-while-revalidate={micro_cache.stale}'
+        return resp
+    wrapper.micro_cached = True
+    return wrapper
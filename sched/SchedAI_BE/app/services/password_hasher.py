@@ -0,0 +1,89 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from app import bcrypt
+
+# bcrypt is deliberately CPU-bound. Hashes run on a small pool of their own
+# (bcrypt releases the GIL, so request threads keep serving meanwhile), with
+# a cap on how many may queue: a login burst gets fast 503s once the pool is
+# saturated instead of parking every request thread of the worker behind it.
+
+class HashLimitError(Exception):
+    pass
+
+
+class PasswordHasher:
+    def __init__(self):
+        self.workers = 1
+        self.max_pending = 2
+        self.timeout = 5
+        self.rounds = 12
+        self._executor = None
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.rehashed = 0
+
+    def init_app(self, app):
+        self.workers = app.config.get('PASSWORD_HASH_WORKERS', self.workers)
+        self.max_pending = app.config.get('PASSWORD_HASH_MAX_PENDING', self.max_pending)
+        self.timeout = app.config.get('PASSWORD_HASH_TIMEOUT', self.timeout)
+        self.rounds = app.config.get('BCRYPT_LOG_ROUNDS', self.rounds)
+
+    def executor(self):
+        # created lazily so each forked gunicorn worker gets its own threads
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='bcrypt')
+            return self._executor
+
+    def _run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise HashLimitError('Too many sign-ins in progress, try again shortly')
+            self._pending += 1
+        future = self.executor().submit(fn, *args)
+        # released when the hash finishes, even if the caller gave up on it
+        future.add_done_callback(self._release)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            raise HashLimitError('Sign-in is busy, try again shortly')
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+
+    def hash(self, password):
+        return self._run(bcrypt.generate_password_hash, password, self.rounds).decode('utf-8')
+
+    def verify(self, password_hash, password):
+        return self._run(bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        # modular crypt format: $2b$<cost>$<salt+hash>
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return False
+
+    def upgrade(self, password_hash, password):
+        # after a successful verify: a hash at the configured cost if the
+        # stored one differs, else None. Skipped while the pool is saturated;
+        # the next login tries again.
+        if not self.needs_rehash(password_hash):
+            return None
+        try:
+            new_hash = self.hash(password)
+        except HashLimitError:
+            return None
+        self.rehashed += 1
+        return new_hash
+
+    def stats(self):
+        return {'pending': self._pending, 'rejected': self.rejected, 'rehashed': self.rehashed}
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,122 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, g, jsonify, request
+
+# Token buckets for the unauthenticated endpoints: one per client IP and one
+# per target (slug, user or appointment), so neither a single scraper nor a
+# viral link to one host can take every worker. Buckets live in process by
+# default, or in Redis (RATE_LIMIT_URL) to share them between workers.
+
+class LocalRateLimitStore:
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, now):
+        # returns seconds until a token is available, 0 if one was taken
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class RedisRateLimitStore:
+    # the refill-and-take runs as one script so concurrent workers can't
+    # both spend the last token
+    SCRIPT = """
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+    local rate, burst, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+    local tokens = tonumber(state[1]) or burst
+    local updated = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+    local wait = 0
+    if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+    redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+    return tostring(wait)
+    """
+
+    def __init__(self, url):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._take = self._redis.register_script(self.SCRIPT)
+
+    def take(self, key, rate, burst, now):
+        return float(self._take(keys=[f'ratelimit:{key}'], args=[rate, burst, now]))
+
+
+class RateLimiter:
+    def __init__(self):
+        self.store = None
+        self.enabled = True
+        self.limited = 0
+
+    def init_app(self, app):
+        self.enabled = app.config.get('RATE_LIMIT_ENABLED', True)
+        url = app.config.get('RATE_LIMIT_URL')
+        self.store = RedisRateLimitStore(url) if url else LocalRateLimitStore()
+
+    def _store(self):
+        if self.store is None:
+            self.store = LocalRateLimitStore()
+        return self.store
+
+    def check(self, key, rate, burst):
+        wait = self._store().take(key, rate, burst, time.time())
+        if wait > 0:
+            self.limited += 1
+        return wait
+
+
+rate_limiter = RateLimiter()
+
+
+def _limit(key, rate, burst):
+    # a 429 with Retry-After when the bucket is empty, else None
+    wait = rate_limiter.check(key, rate, burst)
+    if wait > 0:
+        resp = jsonify({'error': 'Too many requests'})
+        resp.headers['Retry-After'] = str(math.ceil(wait))
+        return resp, 429
+    return None
+
+def rate_limited(target_arg=None):
+    # Limits the view per client IP, and per target when `target_arg` names
+    # the view argument identifying it (e.g. 'slug'). Rejected requests get a
+    # 429 with Retry-After. On a @micro_cached view the target bucket is only
+    # spent when the view actually renders, so a popular host's cached page
+    # is limited per IP alone.
+    def decorator(view):
+        cached = getattr(view, 'micro_cached', False)
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if rate_limiter.enabled:
+                config = current_app.config
+                limited = _limit(f'ip:{request.remote_addr}', config['RATE_LIMIT_IP_RATE'], config['RATE_LIMIT_IP_BURST'])
+                if limited:
+                    return limited
+                if target_arg:
+                    target = (f'{request.endpoint}:{kwargs[target_arg]}',
+                              config['RATE_LIMIT_TARGET_RATE'], config['RATE_LIMIT_TARGET_BURST'])
+                    if cached:
+                        g.micro_cache_miss_guard = lambda: _limit(*target)
+                    else:
+                        limited = _limit(*target)
+                        if limited:
+                            return limited
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from sqlalchemy import and_, or_
+from app.models import Appointment, User
+
+# Confirmed appointments with a guest email, across all hosts, whose start
+# falls inside a window of the host's own local days (day 1 = tomorrow in the
+# host's timezone). Rows are streamed in (start_time, id) order over the
+# (status, start_time, id) index, so callers can stop and resume anywhere.
+
+# no timezone is further than this from UTC, so widening the UTC range by it
+# (plus a day for hosts whose local date differs) covers every host's window
+MAX_UTC_OFFSET = timedelta(hours=14)
+
+@lru_cache(maxsize=None)
+def zone(name):
+    try:
+        return ZoneInfo(name or 'UTC')
+    except (ZoneInfoNotFoundError, ValueError):
+        return ZoneInfo('UTC')
+
+def valid_timezone(name):
+    try:
+        ZoneInfo(name)
+        return True
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+
+def local_window(tz_name, start_day, days, now):
+    # [midnight of local day start_day, midnight `days` later), as naive UTC
+    tz = zone(tz_name)
+    local_today = now.replace(tzinfo=timezone.utc).astimezone(tz).date()
+    bounds = []
+    for d in (local_today + timedelta(days=start_day), local_today + timedelta(days=start_day + days)):
+        midnight = datetime.combine(d, datetime.min.time()).replace(tzinfo=tz)
+        bounds.append(midnight.astimezone(timezone.utc).replace(tzinfo=None))
+    return bounds[0], bounds[1]
+
+def upcoming(columns, start_day=1, days=1, after=None, limit=None, now=None):
+    # yields (row, host_timezone); rows are `columns` followed by start_time, id
+    now = now or datetime.utcnow()
+    utc_today = datetime.combine(now.date(), datetime.min.time())
+    query = Appointment.query.with_entities(
+        *columns, User.timezone, Appointment.start_time, Appointment.id
+    ).join(User, User.id == Appointment.host_user_id).filter(
+        Appointment.status == 'confirmed',
+        Appointment.guest_email != None,
+        Appointment.start_time >= utc_today + timedelta(days=start_day - 1) - MAX_UTC_OFFSET,
+        Appointment.start_time < utc_today + timedelta(days=start_day + days + 1) + MAX_UTC_OFFSET
+    )
+    if after:
+        after_start, after_id = after
+        query = query.filter(or_(
+            Appointment.start_time > after_start,
+            and_(Appointment.start_time == after_start, Appointment.id > after_id)
+        ))
+    query = query.order_by(Appointment.start_time, Appointment.id).yield_per(500)
+
+    windows = {}
+    sent = 0
+    for row in query:
+        tz_name = row[len(columns)]
+        if tz_name not in windows:
+            windows[tz_name] = local_window(tz_name, start_day, days, now)
+        window_start, window_end = windows[tz_name]
+        start_time = row[-2]
+        if not window_start <= start_time < window_end:
+            continue
+        yield row[:len(columns)] + row[-2:], tz_name
+        sent += 1
+        if limit is not None and sent >= limit:
+            return
@@ -0,0 +1,93 @@
+import base64
+import json
+from datetime import datetime
+from flask import Response, request
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Responses are built from column tuples rather than hydrated ORM objects and
+# encoded in one pass. Keys come out in the casing the client asks for with
+# the X-Key-Case header: `snake`, `camel`, or by default the historic shape
+# (snake_case plus whatever camelCase duplicates the endpoint always sent).
+
+KEY_CASE_HEADER = 'X-Key-Case'
+
+def camel(key):
+    head, *rest = key.split('_')
+    return head + ''.join(part.title() for part in rest)
+
+def key_case():
+    case = request.headers.get(KEY_CASE_HEADER, '').lower()
+    return case if case in ('snake', 'camel') else 'compat'
+
+
+class Projection:
+    def __init__(self, fields, compat_aliases=()):
+        # fields: (snake_case key, column) pairs, in output order
+        self.fields = list(fields)
+        self.compat_aliases = set(compat_aliases)
+        self._camel = {key: camel(key) for key, _ in self.fields}
+
+    @property
+    def columns(self):
+        return [column for _, column in self.fields]
+
+    def select(self, names):
+        # ?fields= subset, accepting either casing; unknown names are ignored
+        if not names:
+            return self
+        wanted = set(names) | {k for k, c in self._camel.items() if c in names}
+        fields = [f for f in self.fields if f[0] in wanted]
+        return Projection(fields, self.compat_aliases) if fields else self
+
+    def _keys(self, case):
+        if case == 'snake':
+            return [[key] for key, _ in self.fields]
+        if case == 'camel':
+            return [[self._camel[key]] for key, _ in self.fields]
+        return [[key, self._camel[key]] if key in self.compat_aliases else [key] for key, _ in self.fields]
+
+    def dump_rows(self, rows, case=None):
+        # rows are tuples in field order, e.g. Model.query.with_entities(*projection.columns)
+        keys = self._keys(case or key_case())
+        out = []
+        for row in rows:
+            item = {}
+            for names, value in zip(keys, row):
+                for name in names:
+                    item[name] = value
+            out.append(item)
+        return out
+
+    def dump(self, obj, case=None):
+        # a single ORM instance, for create/update responses that already have one
+        return self.dump_rows([tuple(getattr(obj, key) for key, _ in self.fields)], case)[0]
+
+
+def encode_cursor(start_time, row_id):
+    # opaque keyset position for listings ordered by (start_time, id)
+    return base64.urlsafe_b64encode(f'{start_time.isoformat()}|{row_id}'.encode()).decode()
+
+def decode_cursor(cursor):
+    start, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+    return datetime.fromisoformat(start), int(row_id)
+
+
+def _default(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    raise TypeError(f'{type(value).__name__} is not JSON serializable')
+
+def dumps(body):
+    # UTF-8 bytes; datetimes are encoded natively (orjson) or via isoformat(), never by callers
+    if orjson is not None:
+        return orjson.dumps(body, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(body, default=_default, separators=(',', ':')).encode('utf-8')
+
+def json_response(body, status=200, headers=None):
+    resp = Response(dumps(body), status=status, mimetype='application/json', headers=headers)
+    resp.vary.add(KEY_CASE_HEADER)
+    return resp
@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from app.services.slot_generator import generate_slots_range
+
+# Computed slots are cached per (host, date). Each host has two counters:
+# `generation` is part of every key, so bumping it drops the host's whole
+# calendar at once (availability rules changed); `writes` is bumped by every
+# invalidation so a computation that raced with a change is not stored.
+
+class LocalSlotCacheBackend:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def counters(self, host_id):
+        with self._lock:
+            return self._counters.get(host_id, (0, 0))
+
+    def generations(self, host_ids):
+        with self._lock:
+            return {h: self._counters.get(h, (0, 0))[0] for h in host_ids}
+
+    def bump(self, host_id, generation=False):
+        with self._lock:
+            gen, writes = self._counters.get(host_id, (0, 0))
+            self._counters[host_id] = (gen + 1 if generation else gen, writes + 1)
+
+    def get_many(self, keys):
+        now = time.time()
+        with self._lock:
+            found = {}
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is None:
+                    continue
+                if entry[0] <= now:
+                    del self._data[key]
+                    continue
+                self._data.move_to_end(key)
+                found[key] = entry[1]
+            return found
+
+    def set_many(self, items):
+        expires = time.time() + self.ttl
+        with self._lock:
+            for key, value in items.items():
+                self._data[key] = (expires, value)
+                self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete_many(self, keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class RedisSlotCacheBackend:
+    # Shared between workers. Bounding and LRU eviction are left to the Redis
+    # server (maxmemory + allkeys-lru); the TTL is only a safety net.
+    def __init__(self, url, ttl):
+        import redis
+        self.ttl = ttl
+        self.evictions = 0
+        self._redis = redis.Redis.from_url(url)
+
+    def counters(self, host_id):
+        gen, writes = self._redis.mget(f'slots:gen:{host_id}', f'slots:writes:{host_id}')
+        return int(gen or 0), int(writes or 0)
+
+    def generations(self, host_ids):
+        values = self._redis.mget([f'slots:gen:{h}' for h in host_ids]) if host_ids else []
+        return {h: int(v or 0) for h, v in zip(host_ids, values)}
+
+    def bump(self, host_id, generation=False):
+        pipe = self._redis.pipeline()
+        if generation:
+            pipe.incr(f'slots:gen:{host_id}')
+        pipe.incr(f'slots:writes:{host_id}')
+        pipe.execute()
+
+    def get_many(self, keys):
+        values = self._redis.mget(keys) if keys else []
+        return {k: json.loads(v) for k, v in zip(keys, values) if v is not None}
+
+    def set_many(self, items):
+        pipe = self._redis.pipeline()
+        for key, value in items.items():
+            pipe.set(key, json.dumps(value), ex=self.ttl)
+        pipe.execute()
+
+    def delete_many(self, keys):
+        if keys:
+            self._redis.delete(*keys)
+
+
+class SlotCache:
+    def __init__(self):
+        self.backend = None
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        url = app.config.get('SLOT_CACHE_URL')
+        if url:
+            self.backend = RedisSlotCacheBackend(url, app.config.get('SLOT_CACHE_TTL', 86400))
+        else:
+            self.backend = LocalSlotCacheBackend(app.config.get('SLOT_CACHE_MAX_ENTRIES', 4096),
+                                                 app.config.get('SLOT_CACHE_TTL', 86400))
+
+    def _backend(self):
+        if self.backend is None:
+            self.backend = LocalSlotCacheBackend(4096, 86400)
+        return self.backend
+
+    def get_slots(self, user_id, target_date):
+        return self.get_slots_range(user_id, target_date, target_date)[target_date]
+
+    def get_slots_range(self, user_id, start_date, end_date):
+        backend = self._backend()
+        gen, writes = backend.counters(user_id)
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        keys = {d: f'slots:{user_id}:{gen}:{d.isoformat()}' for d in days}
+        found = backend.get_many(list(keys.values()))
+
+        result = {}
+        missing = []
+        for d in days:
+            if keys[d] in found:
+                result[d] = list(found[keys[d]])
+            else:
+                missing.append(d)
+        self.hits += len(days) - len(missing)
+        self.misses += len(missing)
+
+        if missing:
+            computed = generate_slots_range(user_id, missing[0], missing[-1])
+            for d in missing:
+                result[d] = computed[d]
+            if backend.counters(user_id) == (gen, writes):
+                backend.set_many({keys[d]: list(computed[d]) for d in missing})
+        # cached days were filled in first; callers rely on date order
+        return {d: result[d] for d in days}
+
+    def generations(self, user_ids):
+        # bumped whenever a host's availability rules change
+        return self._backend().generations(user_ids)
+
+    def version(self, user_id):
+        # changes with every invalidation of the host, so caches of other
+        # things rendered from their calendar can tell they are out of date
+        return tuple(self._backend().counters(user_id))
+
+    def touch(self, user_id):
+        # a calendar change that leaves the slots alone (a new title)
+        self._backend().bump(user_id)
+
+    def invalidate_host(self, user_id):
+        self._backend().bump(user_id, generation=True)
+
+    def invalidate_interval(self, user_id, start_time, end_time):
+        # an appointment can also block the start of the following day through
+        # the availability buffer, so drop one extra day
+        backend = self._backend()
+        gen, _ = backend.counters(user_id)
+        backend.bump(user_id)
+        day, last = start_time.date(), end_time.date() + timedelta(days=1)
+        keys = []
+        while day <= last:
+            keys.append(f'slots:{user_id}:{gen}:{day.isoformat()}')
+            day += timedelta(days=1)
+        backend.delete_many(keys)
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self._backend().evictions
+        }
+
+
+slot_cache = SlotCache()
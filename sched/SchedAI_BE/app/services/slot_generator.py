@@ -1,42 +1,52 @@
 from datetime import datetime, timedelta, date
-from app.models import AvailabilityRule, Appointment
+from app.models import Appointment
+from app.services.availability_bitmap import (
+    SLOT_MINUTES, DAY_MINUTES, bitmap_cache, tile, rasterize, spread, set_bits
+)
 
 def generate_slots(user_id, target_date):
-    day_of_week = target_date.weekday()  # 0=Mon
-    rules = AvailabilityRule.query.filter_by(
-        user_id=user_id,
-        day_of_week=day_of_week,
-        is_bookable=True
-    ).all()
+    return generate_slots_range(user_id, target_date, target_date)[target_date]
 
-    if not rules:
-        return []
+def generate_slots_range(user_id, start_date, end_date):
+    # end_date is inclusive; returns {date: [slots]} for every day in the window
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    result = {d: [] for d in days}
+    if not days:
+        return result
 
-    day_start = datetime.combine(target_date, datetime.min.time())
-    day_end = day_start + timedelta(days=1)
+    # slot starts over the window, grouped by the buffer of the rule they came from
+    week = bitmap_cache.weekly([user_id])[user_id]
+    starts = {buffer: tile(bits, days) for buffer, bits in week.starts.items()}
+    starts = {buffer: bits for buffer, bits in starts.items() if bits}
+    if not starts:
+        return result
 
-    existing = Appointment.query.filter(
+    # an appointment can block a slot up to its end plus the rule buffer, so
+    # widen the lower bound to catch ones spilling over from the previous day
+    max_buffer = max(starts)
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+    existing = Appointment.query.with_entities(Appointment.start_time, Appointment.end_time).filter(
         Appointment.host_user_id == user_id,
-        Appointment.start_time >= day_start,
-        Appointment.start_time < day_end,
-        Appointment.status == 'confirmed'
+        Appointment.status == 'confirmed',
+        Appointment.start_time < window_end,
+        Appointment.end_time > window_start - timedelta(minutes=max_buffer)
     ).all()
 
-    slots = []
-    for rule in rules:
-        current = datetime.combine(target_date, rule.start_time)
-        end = datetime.combine(target_date, rule.end_time)
-        while current + timedelta(minutes=30) <= end:
-            slot_end = current + timedelta(minutes=30)
-            conflict = any(
-                not (slot_end <= a.start_time or current >= a.end_time + timedelta(minutes=rule.buffer_minutes))
-                for a in existing
-            )
-            if not conflict:
-                slots.append({
-                    'start': current.isoformat(),
-                    'end': slot_end.isoformat()
-                })
-            current += timedelta(minutes=30)
+    # a slot starting at minute m is free iff nothing (plus buffer) is busy
+    # anywhere in m .. m+SLOT_MINUTES-1
+    window_minutes = len(days) * DAY_MINUTES
+    free = 0
+    for buffer, bits in starts.items():
+        busy = rasterize(existing, window_start, window_minutes, buffer)
+        free |= bits & ~spread(busy, SLOT_MINUTES)
+
+    step = timedelta(minutes=SLOT_MINUTES)
+    for minute in set_bits(free):
+        current = window_start + timedelta(minutes=minute)
+        result[days[minute // DAY_MINUTES]].append({
+            'start': current.isoformat(),
+            'end': (current + step).isoformat()
+        })
 
-    return slots
\ No newline at end of file
+    return result
@@ -0,0 +1,88 @@
+import numpy as np
+from datetime import datetime
+
+# Same criteria the /ai/score-slots prompt gives Claude, as (from, to, score,
+# reason) bands over minutes since midnight; the first matching band wins.
+TIME_BANDS = [
+    (8 * 60, 11 * 60, 90, 'Morning slot, ideal for deep focus work'),
+    (11 * 60 + 30, 12 * 60 + 30, 40, 'Right before lunch, a poor time to start new work'),
+    (11 * 60, 11 * 60 + 30, 70, 'Late morning, still good for focused work'),
+    (13 * 60, 15 * 60, 75, 'Early afternoon, good for collaborative meetings'),
+    (15 * 60, 17 * 60, 45, 'Late afternoon, when energy tends to slump'),
+    (12 * 60 + 30, 13 * 60, 55, 'Lunch time, a fair slot'),
+]
+OUTSIDE_HOURS = (30, 'Outside core working hours')
+MIN_GAP = 15
+TIGHT_GAP_PENALTY = 15
+BACK_TO_BACK_PENALTY = 25
+BREATHING_ROOM_BONUS = 5
+
+def wall_clock(value):
+    # the time as written: an offset ('+05:00', 'Z') is dropped rather than
+    # converted, so bands match the host's clock as in the LLM prompt, and
+    # the result compares with the naive appointment times
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return value.replace(tzinfo=None)
+
+def _minutes(values):
+    return np.array([wall_clock(v) for v in values], dtype='datetime64[m]').astype(np.int64)
+
+def score_slots(slots, appointments=()):
+    """Score slots 0-100 against the host's appointments ((start, end) pairs)."""
+    if not slots:
+        return []
+    starts = _minutes([s['start'] for s in slots])
+    ends = _minutes([s['end'] for s in slots])
+    time_of_day = starts % (24 * 60)
+
+    conditions = [(time_of_day >= lo) & (time_of_day < hi) for lo, hi, _, _ in TIME_BANDS]
+    score = np.select(conditions, [b[2] for b in TIME_BANDS], OUTSIDE_HOURS[0])
+    band = np.select(conditions, np.arange(len(TIME_BANDS)), len(TIME_BANDS))
+
+    # gap to the nearest appointment ending before / starting after each slot
+    gap_before = np.full(len(slots), np.iinfo(np.int64).max)
+    gap_after = np.full(len(slots), np.iinfo(np.int64).max)
+    overlaps = np.zeros(len(slots), dtype=bool)
+    if len(appointments):
+        appt_starts = np.sort(_minutes([a[0] for a in appointments]))
+        appt_ends = np.sort(_minutes([a[1] for a in appointments]))
+        i = np.searchsorted(appt_ends, starts, side='right')
+        has_before = i > 0
+        gap_before[has_before] = starts[has_before] - appt_ends[i[has_before] - 1]
+        j = np.searchsorted(appt_starts, ends, side='left')
+        has_after = j < len(appt_starts)
+        gap_after[has_after] = appt_starts[j[has_after]] - ends[has_after]
+        # appointments started before the slot ends minus those already over
+        overlaps = j - i > 0
+
+    nearest = np.minimum(gap_before, gap_after)
+    back_to_back = nearest <= 0
+    tight = (nearest > 0) & (nearest < MIN_GAP)
+    score = score - np.where(back_to_back, BACK_TO_BACK_PENALTY, 0) - np.where(tight, TIGHT_GAP_PENALTY, 0)
+    score = score + np.where(nearest >= MIN_GAP, BREATHING_ROOM_BONUS, 0)
+    score = np.where(overlaps, 0, np.clip(score, 0, 100))
+
+    reasons = [b[3] for b in TIME_BANDS] + [OUTSIDE_HOURS[1]]
+    scored = []
+    for k, slot in enumerate(slots):
+        reason = reasons[band[k]]
+        if overlaps[k]:
+            reason = 'Overlaps an existing appointment'
+        elif back_to_back[k]:
+            reason += ', but it runs back-to-back with another meeting'
+        elif tight[k]:
+            reason += f', but it leaves under {MIN_GAP} minutes between meetings'
+        scored.append({
+            'start': slot['start'],
+            'end': slot['end'],
+            'score': int(score[k]),
+            'reason': reason + '.'
+        })
+    return scored
+
+def slot_window(slots, margin):
+    # the span appointments must overlap to affect any slot's gap penalties
+    starts = [wall_clock(s['start']) for s in slots]
+    ends = [wall_clock(s['end']) for s in slots]
+    return min(starts) - margin, max(ends) + margin
@@ -0,0 +1,111 @@
+import re
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+from app import db
+from app.models import User
+
+# Slug allocation and the slug -> host lookup behind every public route.
+# Lookups are cached per worker for SLUG_CACHE_TTL seconds (unknown slugs for
+# SLUG_CACHE_MISS_TTL); inserts, renames and deletes of a user drop its
+# entries in this worker, and the TTL bounds how long other workers can lag.
+
+PublicHost = namedtuple('PublicHost', 'id name slug')
+
+def slug_base(name):
+    return re.sub(r'\s+', '', name).lower()
+
+def prefix_match(base):
+    # A prefix filter each backend answers from an index: SQLite's LIKE is
+    # case-insensitive and can't use the slug indexes, GLOB can; Postgres
+    # uses ix_users_slug_prefix (varchar_pattern_ops) for LIKE 'base%'.
+    if db.engine.dialect.name == 'sqlite':
+        return User.slug.op('GLOB')(re.sub(r'([*?\[])', r'[\1]', base) + '*')
+    return User.slug.startswith(base, autoescape=True)
+
+def next_free(base, taken):
+    # base, base1, base2, ...: one past the highest numeric suffix in use
+    if base not in taken:
+        return base
+    suffixes = [int(s[len(base):]) for s in taken if s.startswith(base) and s[len(base):].isdigit()]
+    return f'{base}{max(suffixes, default=0) + 1}'
+
+
+class SlugCache:
+    def __init__(self):
+        self.ttl = 60
+        self.miss_ttl = 5
+        self.max_entries = 10000
+        self._entries = OrderedDict()
+        self._slug_by_id = {}
+        self._lock = threading.Lock()
+        self._hooked = False
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.ttl = app.config.get('SLUG_CACHE_TTL', self.ttl)
+        self.miss_ttl = app.config.get('SLUG_CACHE_MISS_TTL', self.miss_ttl)
+        self.max_entries = app.config.get('SLUG_CACHE_MAX_ENTRIES', self.max_entries)
+        if not self._hooked:
+            for name in ('after_insert', 'after_update', 'after_delete'):
+                event.listen(User, name, self._user_changed)
+            event.listen(Session, 'after_commit', self._after_commit)
+            event.listen(Session, 'after_rollback', self._after_rollback)
+            self._hooked = True
+
+    def resolve(self, slug):
+        # PublicHost for the slug, or None when no user has it
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(slug)
+            if entry is not None and now < entry[1]:
+                self._entries.move_to_end(slug)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        row = db.session.execute(select(User.id, User.name, User.slug).where(User.slug == slug)).first()
+        host = PublicHost(*row) if row else None
+        with self._lock:
+            self._entries[slug] = (host, now + (self.ttl if host else self.miss_ttl))
+            self._entries.move_to_end(slug)
+            if host:
+                self._slug_by_id[host.id] = slug
+            while len(self._entries) > self.max_entries:
+                evicted, (old, _) = self._entries.popitem(last=False)
+                if old and self._slug_by_id.get(old.id) == evicted:
+                    del self._slug_by_id[old.id]
+        return host
+
+    def invalidate(self, *slugs):
+        with self._lock:
+            for slug in slugs:
+                entry = self._entries.pop(slug, None)
+                if entry and entry[0] and self._slug_by_id.get(entry[0].id) == slug:
+                    del self._slug_by_id[entry[0].id]
+
+    def _user_changed(self, mapper, connection, target):
+        # the old slug by id: after a commit the attribute history is
+        # usually empty, as the old value was expired rather than loaded
+        with self._lock:
+            slugs = {target.slug, self._slug_by_id.get(target.id)} - {None}
+        self.invalidate(*slugs)
+        # a lookup between this flush and the commit still reads the old row,
+        # so drop the slugs again once the transaction is committed
+        session = inspect(target).session
+        if session is not None:
+            session.info.setdefault('changed_slugs', set()).update(slugs)
+
+    def _after_commit(self, session):
+        self.invalidate(*session.info.pop('changed_slugs', ()))
+
+    def _after_rollback(self, session):
+        session.info.pop('changed_slugs', None)
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._entries)}
+
+
+slug_cache = SlugCache()
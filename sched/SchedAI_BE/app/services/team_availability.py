@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+from app.models import Appointment
+from app.services.availability_bitmap import DAY_MINUTES, bitmap_cache, tile, rasterize, span, runs
+
+def common_slots(user_ids, start_date, end_date, min_minutes):
+    # end_date is inclusive, as in generate_slots_range
+    days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    window_start = datetime.combine(start_date, datetime.min.time())
+    window_end = datetime.combine(end_date, datetime.min.time()) + timedelta(days=1)
+    if not user_ids or not days:
+        return []
+
+    weeks = bitmap_cache.weekly(user_ids)
+    max_buffer = max(week.max_buffer(days) for week in weeks.values())
+    appts = Appointment.query.with_entities(
+        Appointment.host_user_id, Appointment.start_time, Appointment.end_time
+    ).filter(
+        Appointment.host_user_id.in_(user_ids),
+        Appointment.status == 'confirmed',
+        Appointment.start_time < window_end,
+        Appointment.end_time > window_start - timedelta(minutes=max_buffer)
+    ).all()
+    appts_by_user = {user_id: [] for user_id in user_ids}
+    for a in appts:
+        appts_by_user[a.host_user_id].append((a.start_time, a.end_time))
+
+    # a minute is busy for the team if any member is outside their bookable
+    # hours or booked then (extended by that member's largest rule buffer)
+    window_minutes = len(days) * DAY_MINUTES
+    window = span(0, window_minutes)
+    busy = 0
+    for user_id in user_ids:
+        week = weeks[user_id]
+        busy |= window & ~tile(week.open, days)
+        busy |= rasterize(appts_by_user[user_id], window_start, window_minutes, week.max_buffer(days))
+
+    return [{
+        'start': (window_start + timedelta(minutes=start)).isoformat(),
+        'end': (window_start + timedelta(minutes=end)).isoformat()
+    } for start, end in runs(window & ~busy) if end - start >= min_minutes]
@@ -0,0 +1,109 @@
+import zlib
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.models import Transcript, TranscriptSegment
+
+# Transcripts are stored as append-only, zlib-compressed segments. Each save
+# writes only the new text, and reads decompress only the segments they need.
+
+SEGMENT_CHARS = 64 * 1024
+
+class StoredTranscript:
+    def __init__(self, appointment_id, content, created_at):
+        self.id = appointment_id
+        self.appointment_id = appointment_id
+        self.content = content
+        self.created_at = created_at
+
+def last_segment(appointment_id):
+    return TranscriptSegment.query.filter_by(appointment_id=appointment_id).order_by(
+        TranscriptSegment.seq.desc()
+    ).first()
+
+def append(appointment_id, text):
+    return _write(appointment_id, lambda last: (last, text))
+
+def save(appointment_id, content):
+    # Full-text saves from the live note taker: when the stored text is a
+    # prefix of the new content (checked via the running crc, without reading
+    # it back) only the tail is appended; otherwise the transcript is rewritten
+    def plan(last):
+        stored = last.offset + last.length if last else 0
+        if last and (len(content) < stored or zlib.crc32(content[:stored].encode('utf-8')) != last.crc):
+            TranscriptSegment.query.filter_by(appointment_id=appointment_id).delete()
+            return None, content
+        return last, content[stored:]
+    return _write(appointment_id, plan)
+
+def _write(appointment_id, plan, retries=3):
+    for attempt in range(retries):
+        last, text = plan(last_segment(appointment_id))
+        seq = last.seq + 1 if last else 0
+        offset = last.offset + last.length if last else 0
+        crc = last.crc if last else 0
+        segments = []
+        for start in range(0, len(text), SEGMENT_CHARS):
+            piece = text[start:start + SEGMENT_CHARS]
+            encoded = piece.encode('utf-8')
+            crc = zlib.crc32(encoded, crc)
+            segments.append(TranscriptSegment(
+                appointment_id=appointment_id, seq=seq, offset=offset, length=len(piece),
+                crc=crc, data=zlib.compress(encoded)
+            ))
+            seq += 1
+            offset += len(piece)
+        db.session.add_all(segments)
+        try:
+            db.session.commit()
+            return segments
+        except IntegrityError:
+            # another writer took the same seq; plan again on top of it
+            db.session.rollback()
+            if attempt == retries - 1:
+                raise
+
+def total_length(appointment_id):
+    last = last_segment(appointment_id)
+    return last.offset + last.length if last else 0
+
+def read(appointment_id, offset=0, length=None):
+    query = TranscriptSegment.query.filter(
+        TranscriptSegment.appointment_id == appointment_id,
+        TranscriptSegment.offset + TranscriptSegment.length > offset
+    )
+    if length is not None:
+        query = query.filter(TranscriptSegment.offset < offset + length)
+    segments = query.order_by(TranscriptSegment.seq).all()
+    text = ''.join(_decode(s) for s in segments)
+    start = offset - segments[0].offset if segments else 0
+    return text[start:start + length] if length is not None else text[start:]
+
+def read_segments(appointment_id, from_seq=0, to_seq=None):
+    query = TranscriptSegment.query.filter(
+        TranscriptSegment.appointment_id == appointment_id,
+        TranscriptSegment.seq >= from_seq
+    )
+    if to_seq is not None:
+        query = query.filter(TranscriptSegment.seq <= to_seq)
+    return [{
+        'seq': s.seq,
+        'offset': s.offset,
+        'length': s.length,
+        'text': _decode(s),
+        'created_at': s.created_at.isoformat()
+    } for s in query.order_by(TranscriptSegment.seq).all()]
+
+def iter_text(appointment_id):
+    query = TranscriptSegment.query.filter_by(appointment_id=appointment_id).order_by(TranscriptSegment.seq)
+    for segment in query.yield_per(32):
+        yield _decode(segment)
+
+def latest(appointment_id):
+    # full transcript, or the newest legacy Transcript row if it predates segments
+    last = last_segment(appointment_id)
+    if last:
+        return StoredTranscript(appointment_id, ''.join(iter_text(appointment_id)), last.created_at)
+    return Transcript.query.filter_by(appointment_id=appointment_id).order_by(Transcript.created_at.desc()).first()
+
+def _decode(segment):
+    return zlib.decompress(segment.data).decode('utf-8')
@@ -1,46 +1,92 @@
 from app import db
 from app.models import Waitlist, Appointment
-from app.services.slot_generator import generate_slots
+from app.services.slot_generator import generate_slots_range
+from app.services.availability_bitmap import DAY_MINUTES, bitmap_cache
+from app.services.slot_cache import slot_cache
+from app.services import calendar_version
+from app.services.webhook_dispatcher import enqueue_webhook, dispatcher
 from datetime import datetime, date, timedelta
-import requests
-import os
 
-def check_waitlist(host_user_id):
-    waiting = Waitlist.query.filter_by(host_user_id=host_user_id, status='waiting').all()
-    booked = []
+def expire_waitlist(host_user_id=None, now=None):
+    # entries whose preferred window has passed can never be matched again
+    query = Waitlist.query.filter(
+        Waitlist.status == 'waiting',
+        Waitlist.preferred_end <= (now or datetime.utcnow())
+    )
+    if host_user_id is not None:
+        query = query.filter(Waitlist.host_user_id == host_user_id)
+    return query.update({Waitlist.status: 'expired'}, synchronize_session=False)
+
+def rule_buffers(week, start):
+    minute = start.weekday() * DAY_MINUTES + start.hour * 60 + start.minute
+    return [buffer for buffer, bits in week.starts.items() if bits >> minute & 1]
+
+def check_waitlist(host_user_id, freed_start, freed_end):
+    expire_waitlist(host_user_id)
+    # only entries whose preferred window overlaps the freed interval, oldest first
+    waiting = Waitlist.query.filter(
+        Waitlist.host_user_id == host_user_id,
+        Waitlist.status == 'waiting',
+        Waitlist.preferred_start < freed_end,
+        Waitlist.preferred_end > freed_start
+    ).order_by(Waitlist.created_at, Waitlist.id).all()
+    if not waiting:
+        db.session.commit()
+        return []
+    # hold the host's calendar so a concurrent booking can't take a slot
+    # between computing free time and inserting
+    calendar_version.bump(host_user_id)
+
+    # one shared slot set for every entry; a booking removes every slot it
+    # now blocks, so no two entries can be handed the same time
+    slots_by_day = generate_slots_range(host_user_id, freed_start.date(), freed_end.date())
+    free = sorted(
+        (datetime.fromisoformat(s['start']), datetime.fromisoformat(s['end']))
+        for day_slots in slots_by_day.values() for s in day_slots
+    )
+    # a slot's rules and their buffers: a booking blocks it until the
+    # booking's end plus the buffer, unless some rule offering it has one short
+    # enough (the same test generate_slots_range applies)
+    week = bitmap_cache.weekly([host_user_id])[host_user_id]
+    free = [
+        (start, end, [timedelta(minutes=buffer) for buffer in rule_buffers(week, start)])
+        for start, end in free
+    ]
+
+    bookings = []
     for entry in waiting:
-        # get free slots in their preferred window
-        target_date = entry.preferred_start.date()
-        slots = generate_slots(host_user_id, target_date)
-        for slot in slots:
-            slot_start = datetime.fromisoformat(slot['start'])
-            slot_end = datetime.fromisoformat(slot['end'])
-            if slot_start >= entry.preferred_start and slot_end <= entry.preferred_end:
-                # book it
-                appt = Appointment(
-                    host_user_id=host_user_id,
-                    guest_name=entry.guest_name,
-                    guest_email=entry.guest_email,
-                    title=f"Meeting with {entry.guest_name}",
-                    reason=entry.guest_reason,
-                    start_time=slot_start,
-                    end_time=slot_end,
-                    type='external',
-                    status='confirmed'
-                )
-                db.session.add(appt)
-                entry.status = 'booked'
-                db.session.commit()
-                # notify n8n
-                try:
-                    requests.post(os.getenv('N8N_WEBHOOK_URL', ''), json={
-                        'guest_name': entry.guest_name,
-                        'guest_email': entry.guest_email,
-                        'start_time': slot_start.isoformat(),
-                        'end_time': slot_end.isoformat()
-                    }, timeout=3)
-                except:
-                    pass
-                booked.append(entry.guest_name)
-                break
-    return booked
\ No newline at end of file
+        slot = next((s for s in free if s[0] >= entry.preferred_start and s[1] <= entry.preferred_end), None)
+        if slot is None:
+            continue
+        slot_start, slot_end, _ = slot
+        db.session.add(Appointment(
+            host_user_id=host_user_id,
+            guest_name=entry.guest_name,
+            guest_email=entry.guest_email,
+            title=f"Meeting with {entry.guest_name}",
+            reason=entry.guest_reason,
+            start_time=slot_start,
+            end_time=slot_end,
+            type='external',
+            status='confirmed'
+        ))
+        entry.status = 'booked'
+        # notify n8n; delivered by the dispatcher once this commits
+        enqueue_webhook({
+            'guest_name': entry.guest_name,
+            'guest_email': entry.guest_email,
+            'start_time': slot_start.isoformat(),
+            'end_time': slot_end.isoformat()
+        })
+        free = [
+            s for s in free
+            if s[1] <= slot_start or any(s[0] >= slot_end + buffer for buffer in s[2])
+        ]
+        bookings.append((entry, slot_start, slot_end))
+    db.session.commit()
+
+    for entry, slot_start, slot_end in bookings:
+        slot_cache.invalidate_interval(host_user_id, slot_start, slot_end)
+    if bookings:
+        dispatcher.wake()
+    return [entry.guest_name for entry, _, _ in bookings]
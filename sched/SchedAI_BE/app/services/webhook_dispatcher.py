@@ -0,0 +1,138 @@
+import json
+import threading
+import time
+from datetime import datetime, timedelta
+import requests
+from requests.adapters import HTTPAdapter
+from app import db
+from app.models import WebhookOutbox
+from app.services.metrics import metrics
+
+def enqueue_webhook(payload, url=None):
+    # adds the event to the caller's session so it commits (or rolls back)
+    # together with the change it describes
+    url = url or dispatcher.url()
+    if not url:
+        return None
+    entry = WebhookOutbox(url=url, payload=json.dumps(payload))
+    db.session.add(entry)
+    return entry
+
+
+class WebhookDispatcher:
+    def __init__(self):
+        self.app = None
+        self._session = None
+        self._thread = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        self.app = app
+
+    def url(self):
+        return self.app.config.get('N8N_WEBHOOK_URL') if self.app else None
+
+    def session(self):
+        if self._session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.app.config['WEBHOOK_BATCH_SIZE'])
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            self._session = session
+        return self._session
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self.run, name='webhook-dispatcher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def wake(self):
+        self._wake.set()
+
+    def run(self):
+        while not self._stop.is_set():
+            drained = 0
+            with self.app.app_context():
+                try:
+                    drained = self.drain()
+                except Exception:
+                    db.session.rollback()
+                    self.app.logger.exception('webhook dispatch failed')
+            # a full batch means there is probably more waiting
+            if drained < self.app.config['WEBHOOK_BATCH_SIZE']:
+                self._wake.wait(self.app.config['WEBHOOK_POLL_SECONDS'])
+                self._wake.clear()
+
+    def drain(self):
+        claimed = self.claim()
+        for entry_id, url, payload, attempts in claimed:
+            started = time.perf_counter()
+            try:
+                resp = self.session().post(
+                    url,
+                    data=payload,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=self.app.config['WEBHOOK_TIMEOUT']
+                )
+                resp.raise_for_status()
+            except requests.RequestException as e:
+                metrics.observe_webhook('error', time.perf_counter() - started)
+                self.finish(entry_id, attempts, self.failed(attempts, str(e)[:1000]))
+            else:
+                metrics.observe_webhook('ok', time.perf_counter() - started)
+                self.finish(entry_id, attempts, {'status': 'sent', 'sent_at': datetime.utcnow()})
+        return len(claimed)
+
+    def claim(self):
+        # Marks a batch as sending under a lease and commits at once, so no
+        # transaction or row lock is held while posting. SKIP LOCKED lets
+        # several workers claim without taking the same rows (ignored on
+        # SQLite); a claim whose lease ran out (the worker died mid-batch) is
+        # taken again, and counts as an attempt.
+        config = self.app.config
+        now = datetime.utcnow()
+        batch = WebhookOutbox.query.filter(
+            WebhookOutbox.status.in_(['pending', 'sending']),
+            WebhookOutbox.next_attempt_at <= now
+        ).order_by(WebhookOutbox.next_attempt_at, WebhookOutbox.id).limit(
+            config['WEBHOOK_BATCH_SIZE']
+        ).with_for_update(skip_locked=True).all()
+        lease = now + timedelta(seconds=config['WEBHOOK_LEASE_SECONDS'])
+        claimed = []
+        for entry in batch:
+            entry.status = 'sending'
+            entry.attempts = (entry.attempts or 0) + 1
+            entry.next_attempt_at = lease
+            claimed.append((entry.id, entry.url, entry.payload, entry.attempts))
+        db.session.commit()
+        return claimed
+
+    def failed(self, attempts, error):
+        config = self.app.config
+        if attempts >= config['WEBHOOK_MAX_ATTEMPTS']:
+            return {'status': 'dead', 'last_error': error}
+        delay = config['WEBHOOK_BACKOFF_SECONDS'] * 2 ** (attempts - 1)
+        return {'status': 'pending', 'last_error': error,
+                'next_attempt_at': datetime.utcnow() + timedelta(seconds=delay)}
+
+    def finish(self, entry_id, attempts, values):
+        # one commit per entry, so a crash re-sends at most the entry in
+        # flight; skipped if the lease expired and another claim took over
+        WebhookOutbox.query.filter(
+            WebhookOutbox.id == entry_id,
+            WebhookOutbox.status == 'sending',
+            WebhookOutbox.attempts == attempts
+        ).update(values, synchronize_session=False)
+        db.session.commit()
+
+
+dispatcher = WebhookDispatcher()
@@ -0,0 +1,51 @@
+import multiprocessing
+import os
+
+# Production server settings, all overridable from the environment.
+#   gunicorn -c gunicorn.conf.py wsgi:app
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+# The slot and availability caches live in each process unless SLOT_CACHE_URL
+# points them at Redis, and a booking or availability change only invalidates
+# the process that handled it. One threaded worker unless they are shared.
+shared_caches = bool(os.getenv('SLOT_CACHE_URL'))
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1 if shared_caches else 1))
+# gthread (default) or gevent suit the I/O-bound Claude and n8n calls; sync
+# keeps one request per process. gevent needs `pip install gevent psycogreen`.
+worker_class = os.getenv('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', 100))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', 5))
+# recycle workers now and then so a leak can't grow forever; jitter keeps them
+# from all restarting at once
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', 200))
+preload_app = True
+accesslog = '-'
+
+
+def on_starting(server):
+    if workers > 1 and not shared_caches:
+        raise RuntimeError('WEB_CONCURRENCY > 1 needs SLOT_CACHE_URL, or workers would offer '
+                           'slots that another worker has already booked')
+    # migrate once in the master, before any worker starts serving
+    from flask_migrate import upgrade
+    from app import create_app
+    with create_app().app_context():
+        upgrade()
+
+
+def post_fork(server, worker):
+    if worker_class == 'gevent':
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+    from wsgi import app
+    from app import db
+    from app.services.webhook_dispatcher import dispatcher
+    with app.app_context():
+        # connections opened in the master during preload must not be shared
+        db.engine.dispose()
+    # threads don't survive fork, so each worker runs its own dispatcher
+    dispatcher.start()
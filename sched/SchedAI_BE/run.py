@@ -1,8 +1,11 @@
-from app import create_app, db
+from app import create_app
+from app.services.webhook_dispatcher import dispatcher
+from flask_migrate import upgrade
 
 app = create_app()
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        upgrade()
+    dispatcher.start()
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,94 @@
+"""Login throughput vs concurrency, and what it does to everything else.
+
+Registers one throwaway user, then for each concurrency level runs that many
+threads logging in back to back while a probe thread polls an authenticated
+scheduling endpoint at a fixed rate. Prints login throughput, latency and
+503s (hash pool saturated), next to the probe's latency; the probe should
+stay flat however hard logins are pushed:
+
+    gunicorn -c gunicorn.conf.py wsgi:app &
+    python scripts/bench_auth.py http://127.0.0.1:8000 --levels 1 2 4 8 16 32 --duration 10
+
+Run it once per BCRYPT_LOG_ROUNDS / PASSWORD_HASH_WORKERS setting to compare.
+"""
+import argparse
+import threading
+import time
+import uuid
+import requests
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+def login_worker(base, credentials, deadline, latencies, statuses, lock):
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            status = session.post(f'{base}/auth/login', json=credentials, timeout=60).status_code
+        except requests.RequestException:
+            status = 'error'
+        elapsed = time.perf_counter() - started
+        with lock:
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+
+def probe(base, headers, deadline, interval, latencies, failures):
+    session = requests.Session()
+    while time.monotonic() < deadline:
+        started = time.perf_counter()
+        try:
+            ok = session.get(f'{base}/appointments', headers=headers, timeout=60).status_code == 200
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        if ok:
+            latencies.append(elapsed)
+        else:
+            failures[0] += 1
+        time.sleep(max(0, interval - elapsed))
+
+def run(base, credentials, headers, concurrency, duration, probe_rate):
+    latencies, statuses, lock = [], {}, threading.Lock()
+    probe_latencies, probe_failures = [], [0]
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=login_worker, args=(base, credentials, deadline, latencies, statuses, lock))
+               for _ in range(concurrency)]
+    threads.append(threading.Thread(target=probe, args=(base, headers, deadline, 1 / probe_rate,
+                                                        probe_latencies, probe_failures)))
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, statuses, probe_latencies, probe_failures[0]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('base', help='base URL of the API')
+    parser.add_argument('--levels', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32], help='login concurrency levels')
+    parser.add_argument('--duration', '-d', type=float, default=10, help='seconds per level')
+    parser.add_argument('--probe-rate', type=float, default=10, help='scheduling requests per second')
+    args = parser.parse_args()
+
+    base = args.base.rstrip('/')
+    run_id = uuid.uuid4().hex[:8]
+    credentials = {'email': f'bench-auth-{run_id}@example.com', 'password': 'bench-auth'}
+    resp = requests.post(f'{base}/auth/register', json={'name': f'Bench Auth {run_id}', **credentials}, timeout=60)
+    resp.raise_for_status()
+    headers = {'Authorization': f"Bearer {resp.json()['token']}"}
+
+    print(f"{'logins':>6} {'login/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'503':>6} {'other':>6}"
+          f" {'probe p50':>10} {'probe p99':>10} {'probe err':>9}")
+    for level in args.levels:
+        latencies, statuses, probe_latencies, probe_failures = run(
+            base, credentials, headers, level, args.duration, args.probe_rate
+        )
+        other = sum(n for status, n in statuses.items() if status not in (200, 503))
+        print(f'{level:>6} {len(latencies) / args.duration:>8.1f} {percentile(latencies, 0.5):>8.1f} '
+              f'{percentile(latencies, 0.99):>8.1f} {statuses.get(503, 0):>6} {other:>6} '
+              f'{percentile(probe_latencies, 0.5):>10.1f} {percentile(probe_latencies, 0.99):>10.1f} {probe_failures:>9}')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""Latency and query-count benchmark for the scheduling hot paths.
+
+Runs each operation against hosts created by scripts/generate_data.py and
+prints the latency distribution and SQL statements per call:
+
+    python scripts/bench_hot_paths.py --prefix synth-1a2b3c --iterations 200 --save baseline.json
+    # ...change something...
+    python scripts/bench_hot_paths.py --prefix synth-1a2b3c --iterations 200 --compare baseline.json
+
+--compare exits non-zero when an operation's p50 grows by more than
+--tolerance or it issues more queries than the baseline did.
+check_waitlist writes; whatever one call books is undone before the next.
+Rate limiting is switched off for the run, and the micro-cache is cleared
+before every cold-cache request.
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import event, select, delete, update
+from flask_jwt_extended import create_access_token
+from app import create_app, db
+from app.models import User, WorkspaceMember, Appointment, Waitlist, WebhookOutbox
+from app.services.slot_generator import generate_slots
+from app.services.conflict_checker import check_conflicts
+from app.services.waitlist_checker import check_waitlist
+from app.services.slot_cache import slot_cache
+from app.services.micro_cache import micro_cache
+from app.services.rate_limit import rate_limiter
+
+class QueryCounter:
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self)
+
+    def __call__(self, *args):
+        self.count += 1
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+def measure(counter, op, iterations, setup=None, teardown=None):
+    latencies, queries = [], []
+    for i in range(iterations):
+        args = setup(i) if setup else ()
+        before = counter.count
+        started = time.perf_counter()
+        op(*args)
+        latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(counter.count - before)
+        if teardown:
+            teardown(*args)
+        db.session.remove()
+    return {
+        'n': iterations,
+        'p50_ms': round(percentile(latencies, 50), 3),
+        'p90_ms': round(percentile(latencies, 90), 3),
+        'p99_ms': round(percentile(latencies, 99), 3),
+        'max_ms': round(max(latencies), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'queries': round(statistics.fmean(queries), 2)
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--prefix', required=True, help='run prefix printed by generate_data.py')
+    parser.add_argument('--iterations', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save', help='write results as JSON')
+    parser.add_argument('--compare', help='baseline JSON from an earlier --save')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed p50 growth vs the baseline')
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    app = create_app()
+    # every request comes from one address as fast as it can
+    rate_limiter.enabled = False
+    client = app.test_client()
+    with app.app_context():
+        hosts = db.session.execute(
+            select(User.id, User.slug).where(User.slug.like(f'{args.prefix}-%'))
+        ).all()
+        if not hosts:
+            raise SystemExit(f'no hosts with prefix {args.prefix}; run scripts/generate_data.py first')
+        memberships = dict(db.session.execute(
+            select(WorkspaceMember.user_id, WorkspaceMember.workspace_id).where(
+                WorkspaceMember.user_id.in_([h.id for h in hosts])
+            )
+        ).all())
+        entries = db.session.execute(
+            select(Waitlist.host_user_id, Waitlist.preferred_start, Waitlist.preferred_end).where(
+                Waitlist.host_user_id.in_([h.id for h in hosts]), Waitlist.status == 'waiting'
+            )
+        ).all()
+        db.session.remove()
+        counter = QueryCounter(db.engine)
+
+        def pick_host(i):
+            return rng.choice(hosts)
+
+        def pick_day():
+            day = date.today() + timedelta(days=rng.randrange(1, 30))
+            return day + timedelta(days=(7 - day.weekday()) % 7 if day.weekday() >= 5 else 0)
+
+        def slots_args(i):
+            return pick_host(i).id, pick_day()
+
+        def conflict_args(i):
+            start = datetime.combine(pick_day(), datetime.min.time()) + timedelta(hours=9, minutes=30 * rng.randrange(16))
+            return pick_host(i).id, start, start + timedelta(minutes=30)
+
+        def waitlist_args(i):
+            host_id, start, end = rng.choice(entries)
+            state = (
+                db.session.execute(select(db.func.max(Appointment.id))).scalar() or 0,
+                db.session.execute(select(db.func.max(WebhookOutbox.id))).scalar() or 0,
+                db.session.execute(select(Waitlist.id).where(
+                    Waitlist.host_user_id == host_id, Waitlist.status == 'waiting'
+                )).scalars().all()
+            )
+            db.session.remove()
+            return host_id, start, end, state
+
+        def undo_waitlist(host_id, start, end, state):
+            last_appt, last_outbox, waiting_ids = state
+            db.session.execute(delete(Appointment).where(Appointment.id > last_appt, Appointment.host_user_id == host_id))
+            db.session.execute(delete(WebhookOutbox).where(WebhookOutbox.id > last_outbox))
+            db.session.execute(update(Waitlist).where(Waitlist.id.in_(waiting_ids)).values(status='waiting'))
+            db.session.commit()
+            slot_cache.invalidate_host(host_id)
+
+        def public_args(i):
+            host = pick_host(i)
+            slot_cache.invalidate_host(host.id)
+            micro_cache.clear()
+            return (host.slug,)
+
+        def members_args(i):
+            host = pick_host(i)
+            token = create_access_token(identity=str(host.id))
+            return memberships[host.id], {'Authorization': f'Bearer {token}'}
+
+        def get(path, headers=None):
+            resp = client.get(path, headers=headers)
+            assert resp.status_code == 200, (path, resp.status_code)
+
+        ops = {
+            'generate_slots': (lambda host_id, day: generate_slots(host_id, day), slots_args, None),
+            'check_conflicts': (check_conflicts, conflict_args, None),
+            'check_waitlist': (lambda h, s, e, state: check_waitlist(h, s, e), waitlist_args, undo_waitlist),
+            'GET /public/slots (cold cache)': (lambda slug: get(f'/public/slots/{slug}'), public_args, None),
+            'GET /public/slots (warm cache)': (lambda slug: get(f'/public/slots/{slug}'),
+                                               lambda i: (hosts[0].slug,), None),
+            'GET /workspaces/<id>/members': (lambda ws_id, headers: get(f'/workspaces/{ws_id}/members', headers),
+                                             members_args, None),
+            'GET /workspaces/<id>/common-slots': (lambda ws_id, headers: get(f'/workspaces/{ws_id}/common-slots', headers),
+                                                  members_args, None),
+        }
+        if not entries:
+            del ops['check_waitlist']
+
+        results = {}
+        for name, (op, setup, teardown) in ops.items():
+            results[name] = measure(counter, op, args.iterations, setup, teardown)
+
+    print(f"{'operation':<36} {'p50':>8} {'p90':>8} {'p99':>8} {'max':>8} {'queries':>8}")
+    for name, r in results.items():
+        print(f"{name:<36} {r['p50_ms']:>8.2f} {r['p90_ms']:>8.2f} {r['p99_ms']:>8.2f} {r['max_ms']:>8.2f} {r['queries']:>8.1f}")
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = []
+        for name, r in results.items():
+            base = baseline.get(name)
+            if not base:
+                continue
+            if r['p50_ms'] > base['p50_ms'] * (1 + args.tolerance):
+                regressions.append(f"{name}: p50 {base['p50_ms']:.2f} -> {r['p50_ms']:.2f} ms")
+            if r['queries'] > base['queries']:
+                regressions.append(f"{name}: queries {base['queries']} -> {r['queries']}")
+        for line in regressions:
+            print('REGRESSION', line)
+        raise SystemExit(1 if regressions else 0)
+
+if __name__ == '__main__':
+    main()
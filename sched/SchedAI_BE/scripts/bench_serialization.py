@@ -0,0 +1,90 @@
+"""Per-row cost of appointment serialization.
+
+Compares the old path (hydrate ORM objects, build the dual-cased dict with
+four isoformat() calls, jsonify) with the projection path (column tuples,
+one encoder pass) in each X-Key-Case, against an in-memory SQLite database:
+
+    python scripts/bench_serialization.py --rows 5000 --repeat 5
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from flask import jsonify
+from app import create_app, db
+from app.models import User, Appointment
+from app.blueprints.appointments import APPOINTMENT
+from app.services.serializers import json_response
+
+def legacy_serialize(a):
+    return {
+        'id': a.id,
+        'workspace_id': a.workspace_id,
+        'host_user_id': a.host_user_id,
+        'guest_name': a.guest_name,
+        'guest_email': a.guest_email,
+        'guestName': a.guest_name,
+        'guestEmail': a.guest_email,
+        'title': a.title,
+        'reason': a.reason,
+        'start_time': a.start_time.isoformat(),
+        'end_time': a.end_time.isoformat(),
+        'startTime': a.start_time.isoformat(),
+        'endTime': a.end_time.isoformat(),
+        'type': a.type,
+        'status': a.status
+    }
+
+def legacy(user_id):
+    appts = Appointment.query.filter(Appointment.host_user_id == user_id).all()
+    return jsonify([legacy_serialize(a) for a in appts])
+
+def projected(user_id, case):
+    rows = Appointment.query.with_entities(*APPOINTMENT.columns).filter(Appointment.host_user_id == user_id).all()
+    return json_response(APPOINTMENT.dump_rows(rows, case))
+
+def seed(rows):
+    user = User(name='Bench', email='bench@example.com', password_hash='x', slug='bench')
+    db.session.add(user)
+    db.session.flush()
+    start = datetime(2026, 3, 2, 9, 0)
+    db.session.add_all(Appointment(
+        host_user_id=user.id, title=f'Meeting {i}', guest_name='Guest Name', guest_email='guest@example.com',
+        reason='Quarterly planning and follow-ups', start_time=start + timedelta(minutes=30 * i),
+        end_time=start + timedelta(minutes=30 * i + 30)
+    ) for i in range(rows))
+    db.session.commit()
+    return user.id
+
+def bench(label, fn, rows, repeat):
+    best, size = None, 0
+    for _ in range(repeat):
+        db.session.expunge_all()
+        started = time.perf_counter()
+        resp = fn()
+        size = len(resp.get_data())
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f'{label:<22} {best * 1e6 / rows:8.2f} us/row {size / rows:8.1f} bytes/row')
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.test_request_context():
+        db.create_all()
+        user_id = seed(args.rows)
+        bench('legacy (ORM + jsonify)', lambda: legacy(user_id), args.rows, args.repeat)
+        for case in ('compat', 'snake', 'camel'):
+            bench(f'projection ({case})', lambda: projected(user_id, case), args.rows, args.repeat)
+
+if __name__ == '__main__':
+    main()
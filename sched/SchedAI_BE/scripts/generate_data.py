@@ -0,0 +1,186 @@
+"""Bulk synthetic data for benchmarks.
+
+Inserts hosts with weekday availability, workspaces, years of appointments at
+a realistic daily density, and waitlist entries, using batched Core inserts
+rather than one ORM add per row. Runs against DATABASE_URL; use a throwaway
+database:
+
+    DATABASE_URL=postgresql://localhost/schedai_bench flask --app run.py db upgrade
+    DATABASE_URL=postgresql://localhost/schedai_bench python scripts/generate_data.py \\
+        --hosts 2000 --days 730 --per-day 5
+
+That is roughly 2000 x 730 x 5/7*5 = 5M appointments. Prints the run prefix
+that scripts/bench_hot_paths.py takes to pick its sample hosts.
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime, time as dtime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import insert, select
+from app import create_app, db, bcrypt
+from app.models import User, Workspace, WorkspaceMember, AvailabilityRule, AvailabilityBitmap, Appointment, Waitlist
+from app.services.availability_bitmap import WeeklyAvailability
+
+TIMEZONES = ['UTC', 'Europe/London', 'Europe/Berlin', 'Asia/Karachi', 'America/New_York', 'America/Los_Angeles']
+TYPES = ['meeting'] * 6 + ['external'] * 3 + ['focus']
+DAY_START, DAY_END = 9, 17  # working hours the generated rules cover
+SLOTS_PER_DAY = (DAY_END - DAY_START) * 2
+
+def batched(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def bulk_insert(model, rows, size):
+    count = 0
+    for batch in batched(rows, size):
+        db.session.execute(insert(model), batch)
+        db.session.commit()
+        count += len(batch)
+    return count
+
+def poisson(rng, mean):
+    # Knuth; fine for the small means used here
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+def day_appointments(rng, host_id, day, per_day, now):
+    chosen = sorted(rng.sample(range(SLOTS_PER_DAY), min(poisson(rng, per_day), SLOTS_PER_DAY)))
+    taken = set(chosen)
+    for index in chosen:
+        start = datetime.combine(day, dtime(DAY_START)) + timedelta(minutes=30 * index)
+        # an hour when the next half hour is free, otherwise thirty minutes
+        length = 60 if index + 1 < SLOTS_PER_DAY and index + 1 not in taken and rng.random() < 0.3 else 30
+        if length == 60:
+            taken.add(index + 1)
+        yield {
+            'host_user_id': host_id,
+            'guest_name': f'Guest {rng.randrange(100000)}',
+            'guest_email': f'guest{rng.randrange(100000)}@example.com',
+            'title': 'Synthetic meeting',
+            'start_time': start,
+            'end_time': start + timedelta(minutes=length),
+            'type': rng.choice(TYPES),
+            'status': 'cancelled' if rng.random() < 0.08 else 'confirmed',
+            'sequence': 0,
+            'created_at': min(start, now),
+            'updated_at': min(start, now),
+        }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=200)
+    parser.add_argument('--days', type=int, default=365, help='days of history before today')
+    parser.add_argument('--future-days', type=int, default=60)
+    parser.add_argument('--per-day', type=float, default=5, help='mean appointments per host per weekday')
+    parser.add_argument('--workspace-size', type=int, default=25)
+    parser.add_argument('--waitlist', type=int, default=3, help='waiting entries per host')
+    parser.add_argument('--batch', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    prefix = f'synth-{uuid.uuid4().hex[:6]}'
+    now = datetime.utcnow()
+    today = date.today()
+    started = time.perf_counter()
+
+    app = create_app()
+    with app.app_context():
+        # bcrypt is deliberately slow, so every synthetic user shares one hash
+        password_hash = bcrypt.generate_password_hash('synthetic').decode('utf-8')
+        bulk_insert(User, ({
+            'name': f'Synthetic Host {i}',
+            'email': f'{prefix}-{i}@example.com',
+            'password_hash': password_hash,
+            'slug': f'{prefix}-{i}',
+            'timezone': rng.choice(TIMEZONES),
+            'calendar_version': 0,
+            'created_at': now,
+        } for i in range(args.hosts)), args.batch)
+        host_ids = db.session.execute(
+            select(User.id).where(User.slug.like(f'{prefix}-%')).order_by(User.id)
+        ).scalars().all()
+
+        groups = [host_ids[i:i + args.workspace_size] for i in range(0, len(host_ids), args.workspace_size)]
+        bulk_insert(Workspace, ({
+            'name': f'{prefix} workspace {n}',
+            'created_by': group[0],
+            'invite_code': f'{prefix[-6:]}{n:04d}'.upper()[:20],
+            'created_at': now,
+        } for n, group in enumerate(groups)), args.batch)
+        workspace_ids = db.session.execute(
+            select(Workspace.id).where(Workspace.name.like(f'{prefix} workspace %')).order_by(Workspace.id)
+        ).scalars().all()
+        members = bulk_insert(WorkspaceMember, ({
+            'workspace_id': ws_id,
+            'user_id': host_id,
+            'role': 'owner' if k == 0 else 'member',
+        } for ws_id, group in zip(workspace_ids, groups) for k, host_id in enumerate(group)), args.batch)
+
+        host_rules = [{
+            'user_id': host_id,
+            'day_of_week': dow,
+            'start_time': dtime(DAY_START),
+            'end_time': dtime(DAY_END),
+            'buffer_minutes': rng.choice([0, 0, 5, 10]),
+            'is_bookable': True,
+        } for host_id in host_ids for dow in range(5)]
+        rules = bulk_insert(AvailabilityRule, host_rules, args.batch)
+        # compiled as save_availability would
+        by_host = {}
+        for rule in host_rules:
+            by_host.setdefault(rule['user_id'], []).append(AvailabilityRule(**rule))
+        bulk_insert(AvailabilityBitmap, ({
+            'user_id': host_id,
+            'week': WeeklyAvailability.compile(host_rule_objects).to_bytes(),
+            'compiled_at': now,
+        } for host_id, host_rule_objects in by_host.items()), args.batch)
+
+        days = [today + timedelta(days=d) for d in range(-args.days, args.future_days + 1)]
+        weekdays = [d for d in days if d.weekday() < 5]
+        appointments = bulk_insert(Appointment, (
+            row for host_id in host_ids for day in weekdays
+            for row in day_appointments(rng, host_id, day, args.per_day, now)
+        ), args.batch)
+
+        upcoming = [d for d in weekdays if d > today] or [today + timedelta(days=1)]
+        def waitlist_rows():
+            for host_id in host_ids:
+                for _ in range(args.waitlist):
+                    start = datetime.combine(rng.choice(upcoming), dtime(rng.randrange(DAY_START, DAY_END - 2)))
+                    yield {
+                        'host_user_id': host_id,
+                        'guest_name': f'Waiting {rng.randrange(100000)}',
+                        'guest_email': f'waiting{rng.randrange(100000)}@example.com',
+                        'preferred_start': start,
+                        'preferred_end': start + timedelta(hours=rng.choice([1, 2, 3])),
+                        'status': 'waiting',
+                        'created_at': now,
+                    }
+        waiting = bulk_insert(Waitlist, waitlist_rows(), args.batch)
+
+    elapsed = time.perf_counter() - started
+    total = len(host_ids) + len(workspace_ids) + members + rules + appointments + waiting
+    print(f'prefix {prefix}: {len(host_ids)} hosts, {len(workspace_ids)} workspaces, {members} members, '
+          f'{rules} rules, {appointments} appointments, {waiting} waitlist entries')
+    print(f'{total} rows in {elapsed:.1f}s ({total / elapsed:.0f} rows/s)')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""Closed-loop HTTP load test.
+
+Runs the same request mix against one or more base URLs and prints throughput
+and latency percentiles for each, e.g. to compare the dev server with gunicorn.
+All load comes from one address, so disable rate limiting on the servers
+(429s count as errors), and the micro-cache too (PUBLIC_CACHE_TTL=0
+PUBLIC_CACHE_STALE=0) unless it is what you are measuring:
+
+    export RATE_LIMIT_ENABLED=false
+    python run.py &                                   # :5000, dev server
+    gunicorn -c gunicorn.conf.py wsgi:app &           # :8000
+    python scripts/load_test.py --slug janedoe http://127.0.0.1:5000 http://127.0.0.1:8000
+"""
+import argparse
+import statistics
+import threading
+import time
+import requests
+
+def worker(base, paths, deadline, latencies, errors, lock):
+    session = requests.Session()
+    i = 0
+    while time.monotonic() < deadline:
+        path = paths[i % len(paths)]
+        i += 1
+        started = time.perf_counter()
+        try:
+            status = session.get(base + path, timeout=30).status_code
+            ok = status < 500 and status != 429
+        except requests.RequestException:
+            ok = False
+        elapsed = time.perf_counter() - started
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[0] += 1
+
+def run(base, paths, concurrency, duration):
+    latencies, errors, lock = [], [0], threading.Lock()
+    deadline = time.monotonic() + duration
+    threads = [threading.Thread(target=worker, args=(base, paths, deadline, latencies, errors, lock))
+               for _ in range(concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return latencies, errors[0]
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('bases', nargs='+', help='base URLs to compare')
+    parser.add_argument('--slug', required=True, help='public booking slug to request')
+    parser.add_argument('--user-id', type=int, default=1, help='user id for /availability/<id>/slots')
+    parser.add_argument('--concurrency', '-c', type=int, default=32)
+    parser.add_argument('--duration', '-d', type=float, default=20)
+    args = parser.parse_args()
+
+    paths = [f'/public/slots/{args.slug}', f'/availability/{args.user_id}/slots']
+    print(f"{'base':<30} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for base in args.bases:
+        latencies, errors = run(base.rstrip('/'), paths, args.concurrency, args.duration)
+        latencies.sort()
+        print(f'{base:<30} {len(latencies) / args.duration:>8.1f} {percentile(latencies, 0.5):>8.1f} '
+              f'{percentile(latencies, 0.95):>8.1f} {percentile(latencies, 0.99):>8.1f} {errors:>7}')
+        if latencies:
+            print(f"{'':<30} mean {statistics.mean(latencies) * 1000:.1f} ms over {len(latencies)} requests")
+
+if __name__ == '__main__':
+    main()
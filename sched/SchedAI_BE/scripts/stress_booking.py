@@ -0,0 +1,102 @@
+"""Concurrent booking stress test.
+
+Registers throwaway hosts, then has many threads race to book the same
+public slots. Phase one puts every thread on a single host, phase two spreads
+the same threads over all hosts. Afterwards each host's calendar is read
+back and checked for overlapping confirmed appointments:
+
+    RATE_LIMIT_ENABLED=false gunicorn -c gunicorn.conf.py wsgi:app &
+    python scripts/stress_booking.py http://127.0.0.1:8000 --hosts 8 --threads 32 --slots 20
+
+Every booking comes from this machine's address, so start the server with
+RATE_LIMIT_ENABLED=false; a run that gets 429s measures the rate limiter
+instead and fails. Exits non-zero if any slot was booked twice.
+"""
+import argparse
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timedelta
+import requests
+
+def register(base, run_id, i):
+    resp = requests.post(f'{base}/auth/register', json={
+        'name': f'Stress {run_id} {i}',
+        'email': f'stress-{run_id}-{i}@example.com',
+        'password': 'stress-test'
+    }, timeout=30)
+    resp.raise_for_status()
+    body = resp.json()
+    return {'token': body['token'], 'slug': body['user']['slug']}
+
+def hammer(base, slug, slots, results, lock):
+    session = requests.Session()
+    order = list(slots)
+    random.shuffle(order)
+    for start, end in order:
+        try:
+            status = session.post(f'{base}/public/book/{slug}', json={
+                'guest_name': 'Stress Guest',
+                'guest_email': 'guest@example.com',
+                'start_time': start.isoformat(),
+                'end_time': end.isoformat()
+            }, timeout=60).status_code
+        except requests.RequestException:
+            status = 'error'
+        with lock:
+            results.append((slug, start, status))
+
+def phase(base, label, assignments, slots):
+    results, lock = [], threading.Lock()
+    threads = [threading.Thread(target=hammer, args=(base, slug, slots, results, lock)) for slug in assignments]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    statuses = Counter(status for _, _, status in results)
+    booked = Counter((slug, start) for slug, start, status in results if status == 201)
+    doubles = sum(1 for count in booked.values() if count > 1)
+    print(f'{label}: {len(results)} attempts in {elapsed:.2f}s ({len(results) / elapsed:.1f}/s), '
+          f'statuses {dict(statuses)}, slots booked twice: {doubles}')
+    if statuses[429]:
+        raise SystemExit(f'{statuses[429]} attempts were rate limited; restart the server with RATE_LIMIT_ENABLED=false')
+    return doubles
+
+def overlaps(base, host, since, until):
+    resp = requests.get(f'{base}/appointments', params={
+        'from': since.isoformat(), 'to': until.isoformat(), 'limit': 500, 'fields': 'start_time,end_time,status'
+    }, headers={'Authorization': f"Bearer {host['token']}", 'X-Key-Case': 'snake'}, timeout=30)
+    resp.raise_for_status()
+    appts = sorted((a['start_time'], a['end_time']) for a in resp.json()['appointments'] if a['status'] == 'confirmed')
+    return sum(1 for prev, cur in zip(appts, appts[1:]) if cur[0] < prev[1])
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('base', help='e.g. http://127.0.0.1:8000')
+    parser.add_argument('--hosts', type=int, default=8)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--slots', type=int, default=20, help='30-minute slots each thread tries to book')
+    args = parser.parse_args()
+
+    run_id = uuid.uuid4().hex[:8]
+    hosts = [register(args.base, run_id, i) for i in range(args.hosts)]
+    # far enough out to avoid real data; phase two uses a later day so its
+    # slots are free again
+    day_one = datetime(2030, 1, 7, 9, 0) + timedelta(days=random.randrange(0, 3000, 7))
+    slots_one = [(day_one + timedelta(minutes=30 * i), day_one + timedelta(minutes=30 * (i + 1))) for i in range(args.slots)]
+    day_two = day_one + timedelta(days=1)
+    slots_two = [(day_two + timedelta(minutes=30 * i), day_two + timedelta(minutes=30 * (i + 1))) for i in range(args.slots)]
+
+    doubles = phase(args.base, 'one host', [hosts[0]['slug']] * args.threads, slots_one)
+    doubles += phase(args.base, f'{args.hosts} hosts', [hosts[i % args.hosts]['slug'] for i in range(args.threads)], slots_two)
+
+    overlapping = sum(overlaps(args.base, h, day_one, day_two + timedelta(days=1)) for h in hosts)
+    print(f'overlapping confirmed appointments found on read-back: {overlapping}')
+    raise SystemExit(1 if doubles or overlapping else 0)
+
+if __name__ == '__main__':
+    main()
@@ -76,11 +76,22 @@ export const waitlistApi = {
 };
 
 // ── AI ────────────────────────────────────────────────────────
+// Debrief and optimize run as background jobs: a 202 carries the job, which is
+// long-polled until it finishes, and its result is handed back as `data`.
+const followJob = async (request: Promise<any>) => {
+  let res = await request;
+  if (res.status !== 202) return res;
+  while (res.data?.status === 'queued' || res.data?.status === 'running') {
+    res = await api.get(`/ai/jobs/${res.data.id}`, { params: { wait: 25 } });
+  }
+  return { ...res, data: res.data?.result ?? { error: res.data?.error } };
+};
+
 export const aiApi = {
   scoreSlots: (slots: object[], context: object) =>
     api.post('/ai/score-slots', { slots, context }),
   optimize: (appointments: object[]) =>
-    api.post('/ai/optimize', { appointments }),
+    followJob(api.post('/ai/optimize', { appointments })),
   debrief: (appointmentId: number) =>
-    api.post('/ai/debrief', { appointment_id: appointmentId }),
+    followJob(api.post('/ai/debrief', { appointment_id: appointmentId })),
 };